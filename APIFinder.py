@@ -7,8 +7,8 @@ APIFinder - API端点识别工具
 
 import argparse
 import sys
-from requests.packages import urllib3
-from apifinder.core import APIFinderCore
+from apifinder.matchers import check_matchers
+from apifinder.parser import PARSER_BACKENDS
 from apifinder.utils import color_print, error_print
 import config
 
@@ -29,31 +29,109 @@ def parse_args():
     parser.add_argument("-ad", "--apidict", help="API路径字典文件")
     parser.add_argument("-md", "--maxdepth", type=int, help=f"最大爬取深度 (默认: {config.MAX_DEPTH})")
     parser.add_argument("-mu", "--maxurls", type=int, help=f"最大爬取URL数量 (默认: {config.MAX_URLS})")
+    parser.add_argument("-t", "--threads", type=int, help=f"全局并发请求数 (默认: {config.CONCURRENCY})")
+    parser.add_argument("-ht", "--hostthreads", type=int, help=f"单个主机的并发请求数 (默认: {config.PER_HOST_CONCURRENCY})")
+    parser.add_argument("-p", "--parser", choices=PARSER_BACKENDS, help=f"HTML解析后端 (默认: {config.HTML_PARSER})")
+    parser.add_argument("-ec", "--extractcache", help="提取结果缓存文件(SQLite)，可跨多次运行复用")
+    parser.add_argument("-ms", "--maxsize", type=int, help=f"单个响应体的大小上限，单位字节 (默认: {config.MAX_BODY_SIZE})")
+    parser.add_argument("-w", "--workers", type=int, help=f"提取阶段的进程数，0表示在主进程中提取 (默认: {config.WORKERS})")
+    parser.add_argument("-b", "--batch", type=int, help=f"批量模式下同时分析的目标数 (默认: {config.BATCH_SIZE})")
+    parser.add_argument("-tt", "--targettimeout", type=float, help=f"多目标分析时单个目标的时间上限，单位秒，0表示不限制 (默认: {config.TARGET_TIMEOUT:g})")
+    parser.add_argument("-od", "--outputdir", help="批量模式下按目标分别保存API端点结果的目录")
+    parser.add_argument("-cp", "--checkpoint", help="深度爬取的检查点文件，定期保存爬取进度")
+    parser.add_argument("-r", "--resume", help="从检查点文件继续深度爬取（与-cp配合使用）", action="store_true")
+    parser.add_argument("-jl", "--jsonl", help="流式输出文件，每发现一个API端点立即追加一行JSON记录")
+    parser.add_argument("-ns", "--nosummary", help="不在内存中汇总结果，只做流式输出（与-jl配合使用）", action="store_true")
+    parser.add_argument("-rl", "--ratelimit", type=float, help=f"每个主机每秒的请求数上限，遇到429/503或延迟升高时自动降速，0表示不限速 (默认: {config.RATE_LIMIT:g})")
+    parser.add_argument("-ct", "--connecttimeout", type=float, help=f"连接超时，单位秒 (默认: {config.CONNECT_TIMEOUT:g})")
+    parser.add_argument("-rt", "--readtimeout", type=float, help=f"读取超时，单位秒 (默认: {config.READ_TIMEOUT:g})")
+    parser.add_argument("-re", "--retries", type=int, help=f"GET/HEAD请求在连接错误和5xx响应时的重试次数，按指数退避 (默认: {config.RETRIES})")
+    parser.add_argument("-pc", "--poolconnections", type=int, help=f"缓存连接池的主机数 (默认: {config.POOL_CONNECTIONS})")
+    parser.add_argument("-pm", "--poolmaxsize", type=int, help=f"每个主机连接池的最大连接数，不小于全局并发数 (默认: {config.POOL_MAXSIZE})")
+    parser.add_argument("-pf", "--profile", help="记录各阶段耗时，结束时输出汇总表", action="store_true")
+    parser.add_argument("-pj", "--profilejson", help="性能分析数据的JSON输出文件（自动开启性能分析）")
+    parser.add_argument("-pt", "--profiletrace", help="Chrome trace事件格式的输出文件，可在chrome://tracing或Perfetto中查看（自动开启性能分析）")
+    parser.add_argument("-mt", "--matchers", help=f"启用的API匹配器，逗号分隔，可选: {', '.join(config.API_MATCHERS)} (默认: {','.join(config.MATCHERS)})")
+    parser.add_argument("-hc", "--httpcache", help="HTTP条件请求缓存文件(SQLite)，重复扫描时未变化的资源返回304")
+    parser.add_argument("-sm", "--sourcemap", help="获取脚本的Source Map，扫描其中第一方的原始源码（跳过node_modules和重复的源文件）", action="store_true")
+    parser.add_argument("-si", "--stdin", help="常驻模式：从标准输入逐行读取目标直到EOF，避免每个目标启动一次进程（与-j配合处理JS文件）", action="store_true")
     
     return parser.parse_args()
 
 def main():
     """主函数"""
-    # 禁用SSL警告
-    urllib3.disable_warnings()
-    
     # 解析命令行参数
     args = parse_args()
     
     # 检查参数合法性
-    if not args.url and not args.file:
-        error_print("请指定目标URL (-u) 或包含URL的文件 (-f)")
+    if not args.url and not args.file and not args.stdin:
+        error_print("请指定目标URL (-u)、包含URL的文件 (-f) 或从标准输入读取目标 (-si)")
+        sys.exit(1)
+    if args.stdin and (args.url or args.file):
+        error_print("-si 从标准输入读取目标，不能同时使用 -u/-f")
+        sys.exit(1)
+    if args.resume and not args.checkpoint:
+        error_print("使用 --resume 时需要通过 -cp 指定检查点文件")
+        sys.exit(1)
+    if args.nosummary and not args.jsonl:
+        error_print("使用 --nosummary 时需要通过 -jl 指定流式输出文件")
         sys.exit(1)
+    if args.nosummary and (args.outputapi or args.outputurl or args.outputsubdomain or args.outputdir):
+        error_print("--nosummary 模式下结果只写入 -jl 指定的文件，不能同时使用 -oa/-ou/-os/-od")
+        sys.exit(1)
+    
+    matchers = None
+    if args.matchers is not None:
+        matchers = [name.strip() for name in args.matchers.split(",") if name.strip()]
+        unknown = check_matchers(matchers)
+        if unknown:
+            error_print(f"未知的匹配器: {', '.join(unknown)}，可选: {', '.join(config.API_MATCHERS)}")
+            sys.exit(1)
+    
+    # 参数检查通过后再导入requests等较重的模块，-h和参数错误时可立即退出
+    from requests.packages import urllib3
+    from apifinder.core import APIFinderCore
+    
+    # 禁用SSL警告
+    urllib3.disable_warnings()
     
     # 初始化APIFinder核心
     finder = APIFinderCore(
         cookie=args.cookie,
-        api_dictionary_path=args.apidict
+        api_dictionary_path=args.apidict,
+        concurrency=args.threads,
+        per_host=args.hostthreads,
+        parser=args.parser,
+        cache_path=args.extractcache,
+        http_cache_path=args.httpcache,
+        max_body_size=args.maxsize,
+        workers=args.workers,
+        batch_size=args.batch,
+        target_timeout=args.targettimeout,
+        output_dir=args.outputdir,
+        checkpoint_path=args.checkpoint,
+        resume=args.resume,
+        jsonl_path=args.jsonl,
+        summary=not args.nosummary,
+        rps=args.ratelimit,
+        connect_timeout=args.connecttimeout,
+        read_timeout=args.readtimeout,
+        retries=args.retries,
+        pool_connections=args.poolconnections,
+        pool_maxsize=args.poolmaxsize,
+        profile=args.profile,
+        profile_json=args.profilejson,
+        profile_trace=args.profiletrace,
+        matchers=matchers,
+        source_maps=True if args.sourcemap else None
     )
     
     # 执行分析
     try:
-        if args.file:
+        if args.stdin:
+            # 常驻模式
+            finder.analyze_stream(sys.stdin, is_js=args.js)
+        elif args.file:
             # 从文件分析
             finder.analyze_urls_from_file(args.file, is_js=args.js)
         else:
@@ -84,6 +162,8 @@ def main():
     except Exception as e:
         error_print(f"执行过程中出错: {str(e)}")
         sys.exit(1)
+    finally:
+        finder.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+import config
+
+# 计算哈希时每次编码的字符数，避免为大文件生成完整的字节副本
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def content_hash(content, salt=""):
+    """计算内容哈希，salt用于区分不同的提取配置"""
+    digest = hashlib.blake2b(salt.encode("utf-8"), digest_size=20)
+    for start in range(0, len(content), HASH_CHUNK_SIZE):
+        digest.update(content[start:start + HASH_CHUNK_SIZE].encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+class LRUSet:
+    """容量有限的去重集合，超出容量时淘汰最久未出现的键，用于不保存全部结果时的去重"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._keys = OrderedDict()
+
+    def __contains__(self, key):
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        return False
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key):
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.max_entries:
+            self._keys.popitem(last=False)
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+class ExtractionCache:
+    """以内容哈希为键的提取结果缓存，内存中LRU淘汰，可选SQLite落盘以跨运行复用"""
+
+    def __init__(self, max_entries=None, path=None):
+        """初始化缓存，path为SQLite文件路径，为空时只使用内存"""
+        self.max_entries = config.EXTRACT_CACHE_SIZE if max_entries is None else max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, items TEXT NOT NULL)")
+
+    def get(self, key):
+        """查询缓存，未命中返回None"""
+        with self._lock:
+            items = self._entries.get(key)
+            if items is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute("SELECT items FROM results WHERE key = ?", (key,)).fetchone()
+                if row:
+                    items = [tuple(item) for item in json.loads(row[0])]
+                    self._remember(key, items)
+            if items is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return items
+
+    def put(self, key, items):
+        """写入缓存"""
+        with self._lock:
+            self._remember(key, items)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, items) VALUES (?, ?)",
+                    (key, json.dumps(items, ensure_ascii=False))
+                )
+                self._pending_writes += 1
+                if self._pending_writes >= 100:
+                    self._db.commit()
+                    self._pending_writes = 0
+
+    def _remember(self, key, items):
+        """放入内存LRU，超出容量时淘汰最久未使用的条目"""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = items
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def close(self):
+        """提交并关闭磁盘缓存"""
+        with self._lock:
+            if self._db is not None:
+                self._db.commit()
+                self._db.close()
+                self._db = None
@@ -0,0 +1,88 @@
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import config
+from .utils import warning_print
+
+# 检查点格式版本，格式不兼容时递增
+CHECKPOINT_VERSION = 1
+
+class Checkpoint:
+    """深度爬取的检查点，定期把爬取队列、已访问集合和提取结果写入gzip压缩的JSON文件
+
+    主线程只复制一份状态快照，序列化、压缩和写盘在后台线程中进行；
+    写入先落到临时文件再原子替换，进程中途被杀死也不会留下损坏的检查点
+    """
+
+    def __init__(self, path, every_pages=None, every_seconds=None):
+        """path为检查点文件，每处理every_pages个页面或经过every_seconds秒保存一次"""
+        self.path = path
+        self.every_pages = config.CHECKPOINT_PAGES if every_pages is None else every_pages
+        self.every_seconds = config.CHECKPOINT_SECONDS if every_seconds is None else every_seconds
+        self.saved = 0  # 已写入的检查点数
+        self._pages = 0  # 上次保存后处理的页面数
+        self._last_save = time.monotonic()
+        self._executor = None
+        self._writing = None  # 后台写入任务
+
+    def load(self):
+        """读取检查点，文件不存在或格式不兼容时返回None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            warning_print(f"读取检查点 {self.path} 失败: {str(e)}")
+            return None
+        if state.get("version") != CHECKPOINT_VERSION:
+            warning_print(f"检查点 {self.path} 的格式版本不兼容，将重新开始")
+            return None
+        return state
+
+    def page_done(self, get_state):
+        """处理完一个页面后调用，到达保存间隔时取状态快照并在后台写入"""
+        self._pages += 1
+        if self._pages < self.every_pages and time.monotonic() - self._last_save < self.every_seconds:
+            return
+        # 上一次写入尚未完成时推迟到下一个页面，不阻塞爬取
+        if self._writing is not None and not self._writing.done():
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="apifinder-checkpoint")
+        self._writing = self._executor.submit(self._write, get_state())
+        self._pages = 0
+        self._last_save = time.monotonic()
+
+    def save(self, state):
+        """立即同步保存检查点"""
+        self.wait()
+        self._write(state)
+        self._pages = 0
+        self._last_save = time.monotonic()
+
+    def wait(self):
+        """等待后台写入完成"""
+        if self._writing is not None:
+            self._writing.result()
+            self._writing = None
+
+    def _write(self, state):
+        """写入临时文件后原子替换检查点文件"""
+        state = dict(state, version=CHECKPOINT_VERSION)
+        temp_path = self.path + ".tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=1) as f:
+            json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+        self.saved += 1
+
+    def close(self):
+        """等待后台写入完成并关闭写入线程"""
+        try:
+            self.wait()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
@@ -1,17 +1,67 @@
+import copy
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import config
+from .cache import ExtractionCache, LRUSet
+from .checkpoint import Checkpoint
 from .crawler import Crawler
+from .httpcache import HTTPCache
 from .extractor import APIExtractor
 from .processor import ResultProcessor
-from .utils import color_print, success_print, load_api_dictionary
+from .profiler import enable_profiler, get_profiler
+from .ratelimit import HostRateLimiter
+from .session import ConnectionStats
+from .sourcemap import ScriptTail
+from .sink import JSONLSink
+from .workers import ExtractionPool
+from .utils import color_print, error_print, success_print, warning_print, load_api_dictionary
 
 class APIFinderCore:
     """APIFinder核心类，协调各模块工作"""
     
-    def __init__(self, cookie=None, api_dictionary_path=None):
+    def __init__(self, cookie=None, api_dictionary_path=None, concurrency=None, per_host=None, parser=None,
+                 cache_path=None, http_cache_path=None, max_body_size=None, workers=None,
+                 batch_size=None, target_timeout=None, output_dir=None, checkpoint_path=None, resume=False,
+                 jsonl_path=None, summary=True, rps=None, connect_timeout=None, read_timeout=None, retries=None,
+                 profile=False, profile_json=None, profile_trace=None, matchers=None, source_maps=None,
+                 pool_connections=None, pool_maxsize=None):
         """初始化核心组件"""
-        self.crawler = Crawler(cookie=cookie)
+        # 性能分析需要在其他组件开始工作前开启
+        self.profile_json = profile_json
+        self.profile_trace = profile_trace
+        self.profiler = enable_profiler(keep_events=bool(profile_trace)) \
+            if profile or profile_json or profile_trace else get_profiler()
         self.api_dictionary = load_api_dictionary(api_dictionary_path)
-        self.extractor = APIExtractor(self.api_dictionary)
-        self.processor = ResultProcessor()
+        self.matchers = matchers  # 启用的API匹配器，为空时使用配置
+        workers = config.WORKERS if workers is None else workers
+        self.pool = ExtractionPool(workers, self.api_dictionary, matchers) if workers > 0 else None
+        http_cache_path = http_cache_path or config.HTTP_CACHE_PATH
+        self.http_cache = HTTPCache(http_cache_path) if http_cache_path else None
+        self.connection_stats = ConnectionStats()  # 所有爬虫共用的连接复用统计
+        rps = config.RATE_LIMIT if rps is None else rps
+        # 限速器在批量模式的各目标间共享，同一主机的总速率不超过上限
+        self.rate_limiter = HostRateLimiter(rps) if rps > 0 else None
+        # 批量模式下每个目标使用独立的爬虫，共享同样的配置
+        self._crawler_options = dict(cookie=cookie, concurrency=concurrency, per_host=per_host, parser=parser,
+                                     http_cache=self.http_cache, max_body_size=max_body_size, pool=self.pool,
+                                     rate_limiter=self.rate_limiter, connect_timeout=connect_timeout,
+                                     timeout=read_timeout, retries=retries, connection_stats=self.connection_stats,
+                                     source_maps=source_maps, pool_connections=pool_connections,
+                                     pool_maxsize=pool_maxsize)
+        self.crawler = Crawler(**self._crawler_options)
+        self.cache = ExtractionCache(path=cache_path or config.EXTRACT_CACHE_PATH or None)
+        self.sink = JSONLSink(jsonl_path) if jsonl_path else None  # 流式JSONL输出
+        self.summary = summary or self.sink is None  # 是否在内存中保存结果用于展示和保存
+        self.extractor = self._new_extractor()
+        self.processor = ResultProcessor(sink=self.sink, keep_results=self.summary)
+        self.batch_size = max(1, batch_size or config.BATCH_SIZE)
+        self.target_timeout = config.TARGET_TIMEOUT if target_timeout is None else target_timeout
+        self.output_dir = output_dir  # 批量模式下按目标分别保存结果的目录
+        self.checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None  # 深度爬取的检查点
+        self.resume = resume
     
     def analyze_single_url(self, url):
         """分析单个URL"""
@@ -22,16 +72,28 @@ class APIFinderCore:
         if not html_content:
             return False
         
+        return self.analyze_page(url, html_content)
+    
+    def analyze_page(self, url, html_content):
+        """分析已获取的页面内容，不再重复请求页面本身"""
+        with get_profiler().target(url):
+            return self._analyze_page(url, html_content)
+    
+    def _analyze_page(self, url, html_content):
+        """分析页面的脚本、HTML元素和样式表"""
         all_api_info = []
+        sources = []  # 与all_api_info对应的来源
         
-        # 获取并处理脚本内容
-        scripts = self.crawler.get_scripts(url, html_content)
+        # 获取并处理脚本内容，外部脚本边下载边扫描；有进程池时完整下载后交给子进程扫描
+        scripts = self.crawler.get_scripts(url, html_content,
+                                           scan=self.extractor.scan_chunks if self.pool is None else None)
         if scripts:
-            for script_url, content in scripts.items():
+            results = self.extractor.extract_apis_batch(list(scripts.values()), url, labels=list(scripts))
+            for script_url, api_info in zip(scripts, results):
                 color_print(f"从 {script_url} 提取API...")
-                api_info = self.extractor.extract_apis(content, url)
                 if api_info:
                     all_api_info.append(api_info)
+                    sources.append(script_url)
         else:
             color_print("未找到任何脚本内容")
         
@@ -42,21 +104,25 @@ class APIFinderCore:
             api_info = self.extractor.extract_apis_from_html_elements(html_elements, url)
             if api_info:
                 all_api_info.append(api_info)
+                sources.append(url + "#html-elements")
         
         # 获取并处理样式表
         stylesheets = self.crawler.get_stylesheets(url, html_content)
         if stylesheets:
-            for style_url, content in stylesheets.items():
+            results = self.extractor.extract_apis_from_css_batch(list(stylesheets.values()), url,
+                                                                 labels=list(stylesheets))
+            for style_url, api_info in zip(stylesheets, results):
                 color_print(f"从 {style_url} 提取API...")
-                api_info = self.extractor.extract_apis_from_css(content, url)
                 if api_info:
                     all_api_info.append(api_info)
+                    sources.append(style_url)
         
         # 处理提取的API
         if all_api_info:
-            self.processor.process_apis(all_api_info, url)
-            self.processor.extract_related_domains(url)
-            self.processor.remove_duplicates()
+            with get_profiler().span("process"):
+                self.processor.process_apis(all_api_info, url, sources)
+                self.processor.extract_related_domains(url)
+                self.processor.remove_duplicates()
             
             success_print(f"URL {url} 分析完成")
             return True
@@ -74,51 +140,252 @@ class APIFinderCore:
             
             color_print(f"共加载 {len(urls)} 个URL")
             
-            for i, url in enumerate(urls, 1):
-                color_print(f"\n处理第 {i}/{len(urls)} 个URL: {url}")
-                
-                if is_js:
-                    # 直接处理JS文件
-                    content = self.crawler.fetch_content(url)
-                    if content:
-                        api_info = self.extractor.extract_apis(content, url)
-                        if api_info:
-                            self.processor.process_apis([api_info], url)
-                else:
-                    # 处理网页
-                    self.analyze_single_url(url)
+            # 单个目标的时间上限由批量模式执行，-b 1时逐个分析
+            if self.batch_size > 1 or self.output_dir or self.target_timeout:
+                self._analyze_batch(urls, is_js)
+            else:
+                for i, url in enumerate(urls, 1):
+                    color_print(f"\n处理第 {i}/{len(urls)} 个URL: {url}")
+                    self.analyze_target(url, is_js)
             
-            self.processor.extract_subdomains(urls[0] if urls else "")
+            self.processor.extract_related_domains(urls[0] if urls else "")
             self.processor.remove_duplicates()
             return True
             
         except Exception as e:
-            from .utils import error_print
             error_print(f"处理文件时出错: {str(e)}")
             return False
     
+    def analyze_target(self, url, is_js=False):
+        """分析文件中的单个目标"""
+        if is_js:
+            # 直接处理JS文件，边下载边提取，大文件无需整体驻留内存
+            profiler = get_profiler()
+            with profiler.target(url):
+                chunks = self.crawler.iter_chunks(url)
+                tail = ScriptTail(chunks) if self.crawler.source_maps else None
+                all_api_info = [list(self.extractor.iter_apis(tail or chunks, url))]
+                sources = [url]
+                if tail is not None:
+                    # 压缩后的脚本已边下载边扫描，原始源码作为补充再扫描一遍
+                    originals, _ = self.crawler.get_source_map(url, tail.text)
+                    all_api_info += self.extractor.extract_apis_batch(list(originals.values()), url,
+                                                                      labels=list(originals))
+                    sources += list(originals)
+                if any(all_api_info):
+                    with profiler.span("process"):
+                        self.processor.process_apis(all_api_info, url, sources)
+        else:
+            # 处理网页
+            self.analyze_single_url(url)
+    
+    def _new_extractor(self):
+        """创建提取器，不汇总结果时去重只记住最近的config.DEDUP_SIZE个URL"""
+        found_apis = None if self.summary else LRUSet(config.DEDUP_SIZE)
+        return APIExtractor(self.api_dictionary, cache=self.cache, pool=self.pool, matchers=self.matchers,
+                            found_apis=found_apis)
+    
+    def _new_target(self, deadline=None):
+        """创建共享字典、缓存和进程池，但爬取状态和结果相互独立的分析实例，deadline为该目标的截止时间"""
+        target = copy.copy(self)
+        target.crawler = Crawler(**self._crawler_options, deadline=deadline)
+        target.extractor = self._new_extractor()
+        target.processor = ResultProcessor(sink=self.sink, keep_results=self.summary)
+        return target
+    
+    def _run_target(self, url, is_js, index, total, targets, start=0):
+        """在线程池中分析一个目标，返回该目标的独立分析实例"""
+        color_print(f"\n处理第 {start + index + 1}/{total} 个URL: {url}")
+        target = self._new_target(time.monotonic() + self.target_timeout if self.target_timeout else None)
+        targets[index] = target
+        try:
+            target.analyze_target(url, is_js)
+            target.processor.extract_related_domains(url)
+            target.processor.remove_duplicates()
+        finally:
+            target.crawler.close()
+        return target
+    
+    def analyze_stream(self, stream, is_js=False):
+        """常驻模式：逐行读取目标并分析，直到输入结束
+        
+        进程启动、模块导入、字典加载和正则编译只进行一次；每个目标与批量模式一样独立分析，
+        完成后立即保存到输出目录（流式输出在发现API时已写出），再读取下一行
+        """
+        color_print("常驻模式：从标准输入读取目标，每行一个")
+        count = 0
+        first_url = None
+        for line in stream:
+            url = line.strip()
+            if not url:
+                continue
+            count += 1
+            first_url = first_url or url
+            self._analyze_batch([url], is_js, start=count - 1, total="?")
+            success_print(f"目标 {url} 分析完成")
+            # 输出为管道时同样立即可见，调度方可据此判断目标已完成
+            sys.stdout.flush()
+        
+        color_print(f"输入结束，共分析 {count} 个目标")
+        self.processor.extract_related_domains(first_url or "")
+        self.processor.remove_duplicates()
+        return True
+    
+    def _analyze_batch(self, urls, is_js, start=0, total=None):
+        """批量模式：多个目标并发分析，每个目标的已访问集合和去重状态相互独立，结果按输入顺序合并
+        
+        start和total用于显示进度中的序号和总数
+        """
+        targets = {}  # 已开始分析的目标
+        total = len(urls) if total is None else total
+        executor = ThreadPoolExecutor(max_workers=self.batch_size, thread_name_prefix="apifinder-target")
+        futures = [executor.submit(self._run_target, url, is_js, i, total, targets, start)
+                   for i, url in enumerate(urls)]
+        try:
+            for i, (url, future) in enumerate(zip(urls, futures)):
+                try:
+                    target = self._wait_target(future, targets, i)
+                except FutureTimeoutError:
+                    warning_print(f"目标 {url} 超过时间上限 {self.target_timeout:g} 秒，已放弃")
+                    continue
+                except Exception as e:
+                    error_print(f"分析 {url} 时出错: {str(e)}")
+                    continue
+                finally:
+                    targets.pop(i, None)
+                self.processor.merge(target.processor)
+                if self.output_dir:
+                    self._save_target(url, target.processor)
+        finally:
+            # 尚未开始的目标直接取消
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _wait_target(self, future, targets, index):
+        """等待一个目标完成，超过时间上限时终止其请求并抛出TimeoutError"""
+        if not self.target_timeout:
+            return future.result()
+        while True:
+            target = targets.get(index)
+            if target is None:
+                # 目标尚未开始
+                timeout = 1
+            else:
+                timeout = max(0, target.crawler.deadline - time.monotonic())
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                if target is not None:
+                    # 关闭阻塞在慢速连接上的读取，避免占用并发名额
+                    target.crawler.abort()
+                    raise
+    
+    def _save_target(self, url, processor):
+        """把单个目标的结果保存到输出目录，文件名由URL生成"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = re.sub(r"[^\w.\-]+", "_", url.split("://", 1)[-1]).strip("_") or "target"
+        processor.save_results(output_api=os.path.join(self.output_dir, name + ".txt"))
+    
     def deep_analyze(self, start_url, max_depth=None, max_urls=None):
-        """深度分析网站"""
-        # 获取所有要分析的URL
-        urls = self.crawler.deep_crawl(
+        """深度分析网站，爬取与提取在同一遍中流水线进行"""
+        state = self._load_checkpoint(start_url)
+        pages = self.crawler.crawl_pages(
             start_url,
             max_depth=max_depth,
-            max_urls=max_urls
+            max_urls=max_urls,
+            state=state["crawl"] if state else None
         )
         
-        # 分析每个URL
-        for i, url in enumerate(urls, 1):
-            color_print(f"\n分析第 {i}/{len(urls)} 个URL: {url}")
-            self.analyze_single_url(url)
+        analyzed = state["pages"] if state else 0
+        in_page = False  # 是否正在分析页面，此时结果只更新了一部分
+        try:
+            # 每获取一个页面立即分析，无需等待整个爬取结束
+            for url, html_content in pages:
+                analyzed += 1
+                color_print(f"\n分析第 {analyzed} 个URL: {url}")
+                in_page = True
+                self.analyze_page(url, html_content)
+                in_page = False
+                if self.checkpoint:
+                    self.checkpoint.page_done(lambda: self._checkpoint_state(start_url, analyzed))
+        finally:
+            if self.checkpoint:
+                if in_page:
+                    # 中断时页面只分析了一半，保留上一次完整的检查点
+                    self.checkpoint.wait()
+                    warning_print(f"分析中断，可使用 --resume 从检查点 {self.checkpoint.path} 继续")
+                else:
+                    self.checkpoint.save(self._checkpoint_state(start_url, analyzed))
         
-        self.processor.extract_subdomains(start_url)
+        self.processor.extract_related_domains(start_url)
         self.processor.remove_duplicates()
         return True
     
+    def _checkpoint_state(self, start_url, analyzed):
+        """收集检查点所需的全部状态"""
+        return {
+            "start_url": start_url,
+            "pages": analyzed,
+            "crawl": self.crawler.crawl_state(),
+            "found_apis": list(self.extractor.found_apis),
+            "results": self.processor.get_state(),
+        }
+    
+    def _load_checkpoint(self, start_url):
+        """resume时读取检查点并恢复提取和结果状态，返回检查点内容"""
+        if not (self.checkpoint and self.resume):
+            return None
+        state = self.checkpoint.load()
+        if not state:
+            warning_print(f"没有可用的检查点 {self.checkpoint.path}，将从头开始爬取")
+            return None
+        if state["start_url"] != start_url:
+            warning_print(f"检查点属于 {state['start_url']}，与目标URL不一致，将从头开始爬取")
+            return None
+        self.extractor.found_apis.update(state["found_apis"])
+        self.processor.set_state(state["results"])
+        color_print(f"从检查点恢复: 已分析 {state['pages']} 个页面，队列中还有 {len(state['crawl']['queue'])} 个URL")
+        return state
+    
     def display_results(self):
         """展示结果"""
         self.processor.display_results()
+        color_print(f"\n提取缓存: 命中 {self.cache.hits} 次，未命中 {self.cache.misses} 次")
+        if self.http_cache:
+            color_print(f"HTTP缓存: 304复用 {self.http_cache.revalidated} 次，保存 {self.http_cache.stored} 个响应")
+        opened, requests_sent = self.connection_stats.totals()
+        if requests_sent:
+            reused = max(0, requests_sent - opened)
+            color_print(f"连接: 发出 {requests_sent} 个请求，新建 {opened} 个连接，复用 {reused} 次"
+                        f" ({reused * 100 // requests_sent}%)，重试 {self.connection_stats.retries} 次")
+        stats = self.connection_stats
+        if stats.decoded:
+            color_print(f"传输: 接收 {stats.received / 1024 / 1024:.2f}MB，解压后 {stats.decoded / 1024 / 1024:.2f}MB"
+                        f" (节省 {max(0, stats.decoded - stats.received) * 100 // stats.decoded}%)")
+        if self.profiler.enabled:
+            color_print("\n性能分析:")
+            self.profiler.summary()
+        if self.rate_limiter:
+            color_print(f"限速: 每个主机 {self.rate_limiter.rps:g} 次/秒，收到 {self.rate_limiter.throttled} 次429/503响应")
     
     def save_results(self, output_api=None, output_url=None, output_subdomain=None):
         """保存结果"""
         self.processor.save_results(output_api, output_url, output_subdomain)
+        if self.profile_json:
+            self.profiler.save_json(self.profile_json)
+            success_print(f"已将性能分析数据保存到 {self.profile_json}")
+        if self.profile_trace:
+            self.profiler.save_trace(self.profile_trace)
+            success_print(f"已将Chrome trace保存到 {self.profile_trace}")
+    
+    def close(self):
+        """释放爬虫线程并关闭缓存"""
+        self.crawler.close()
+        self.cache.close()
+        if self.checkpoint:
+            self.checkpoint.close()
+        if self.sink:
+            self.sink.close()
+        if self.http_cache:
+            self.http_cache.close()
+        if self.pool:
+            self.pool.close()
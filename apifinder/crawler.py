@@ -1,73 +1,462 @@
+import codecs
+import itertools
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
 import requests
-from bs4 import BeautifulSoup
 import config
 import mimetypes
-from .utils import color_print, error_print, process_url, find_last_occurrences
+from .cache import content_hash
+from .fetcher import FetchEngine
+from .frontier import CrawlFrontier
+from .parser import ParsedPage, resolve_parser
+from .ratelimit import THROTTLE_STATUS, parse_retry_after
+from .profiler import get_profiler
+from .session import RETRY_STATUS, ConnectionStats, accept_encoding, create_session, take_connect_time
+from .sourcemap import ScriptTail, SourceMapReader, decode_data_url, find_reference, is_excluded
+from .urlnorm import normalize_url, parse_url
+from .utils import color_print, error_print, warning_print, process_url, find_last_occurrences
+
+# 响应头中没有字符集时的默认值
+DEFAULT_CHARSET = "utf-8"
+
+def content_charset(content_type):
+    """从Content-Type中取出字符集，没有或无法识别时使用UTF-8"""
+    for param in (content_type or "").split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            try:
+                return codecs.lookup(value.strip().strip("\"'")).name
+            except LookupError:
+                break
+    return DEFAULT_CHARSET
 
 class Crawler:
     """网页爬虫类，负责获取网页内容和链接"""
     
-    def __init__(self, cookie=None, timeout=config.TIMEOUT):
-        """初始化爬虫"""
-        self.session = requests.Session()
+    def __init__(self, cookie=None, timeout=None, concurrency=None, per_host=None, parser=None,
+                 http_cache=None, max_body_size=None, pool=None, rate_limiter=None,
+                 connect_timeout=None, retries=None, connection_stats=None, source_maps=None, deadline=None,
+                 pool_connections=None, pool_maxsize=None):
+        """初始化爬虫，timeout为读取超时，connect_timeout为连接超时，source_maps为是否获取脚本的Source Map
+        
+        pool_connections、pool_maxsize为连接池的主机数和每个主机的最大连接数，见create_session
+        
+        deadline为批量模式下单个目标的截止时间(time.monotonic)，每次尝试的超时不超过剩余时间；
+        给出deadline或rate_limiter时由_open重试失败的请求，urllib3不再重试，每次重试都经过限速器
+        """
+        self.connection_stats = connection_stats or ConnectionStats()
+        self.retries = config.RETRIES if retries is None else retries
+        self._manual_retry = deadline is not None or rate_limiter is not None
+        self.session = create_session(self.connection_stats, concurrency, 0 if self._manual_retry else self.retries,
+                                      throttle_retry=rate_limiter is None, pool_connections=pool_connections,
+                                      pool_maxsize=pool_maxsize)
         self.headers = {
             "User-Agent": config.USER_AGENT,
-            "Cookie": cookie if cookie else ""
+            "Cookie": cookie if cookie else "",
+            "Accept-Encoding": accept_encoding()
         }
-        self.timeout = timeout
+        self.timeout = (connect_timeout or config.CONNECT_TIMEOUT, timeout or config.READ_TIMEOUT)
+        self.http_cache = http_cache  # 条件请求缓存(HTTPCache)，为空时不缓存
+        self.rate_limiter = rate_limiter  # 按主机限速(HostRateLimiter)，为空时不限速
+        self.max_body_size = max_body_size or config.MAX_BODY_SIZE
         self.visited_urls = set()
         self.external_scripts = set()
         self.external_stylesheets = set()
+        self.source_maps = config.SOURCE_MAPS if source_maps is None else source_maps
+        self.seen_sources = set()  # 已扫描的原始源码的哈希，多个Source Map中相同的源文件只扫描一次
+        self.engine = FetchEngine(self.fetch_content, concurrency, per_host)
+        self.parser = resolve_parser(parser)
+        self.pool = pool  # 多进程提取阶段(ExtractionPool)，用于并行解析HTML
+        self._parsed_page = (None, None)  # (html_content, ParsedPage)
+        self._frontier = CrawlFrontier()  # 深度爬取的队列
+        self._pending = deque()  # 当前批次中已标记为访问但尚未产出的 (url, depth)
+        self.deadline = deadline  # 超时后不再发起或继续读取请求
+        self._reading = set()  # 正在读取响应体的响应，abort时关闭其连接
+        self._reading_lock = threading.Lock()
         
-    def fetch_content(self, url):
-        """获取URL内容"""
+    def expired(self):
+        """是否已超过截止时间"""
+        return self.deadline is not None and time.monotonic() > self.deadline
+    
+    def abort(self):
+        """立即终止：标记为已超时并关闭正在读取的连接，阻塞中的读取随即失败返回"""
+        self.deadline = 0
+        with self._reading_lock:
+            responses = list(self._reading)
+        for response in responses:
+            sock = getattr(response.raw.connection, "sock", None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+    
+    def _request_timeout(self):
+        """本次请求的 (连接超时, 读取超时)，有截止时间时不超过剩余时间"""
+        if self.deadline is None:
+            return self.timeout
+        remaining = max(0.01, self.deadline - time.monotonic())
+        return (min(self.timeout[0], remaining), min(self.timeout[1], remaining))
+    
+    def _retry_wait(self, attempt, retry_after=None):
+        """由_open重试前等待：按Retry-After或指数退避，不超过截止时间；已超时时返回False"""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = config.RETRY_BACKOFF * (2 ** attempt)
+        delay = min(delay, config.MAX_RETRY_AFTER)
+        if self.deadline is not None:
+            delay = min(delay, self.deadline - time.monotonic())
+        if self.expired() or delay < 0:
+            return False
+        self.connection_stats.add_retry()
+        time.sleep(delay)
+        return not self.expired()
+    
+    def _open(self, url, check_type=True):
+        """发起流式请求并检查状态码和Content-Type，返回 (response, 304时的本地副本)，都为空表示跳过
+        
+        本地副本为 (响应体, Content-Type)；check_type为False时不按Content-Type跳过
+        """
+        if self.expired():
+            return None, None
+        headers = self.headers
+        if self.http_cache:
+            # 带上上次保存的ETag/Last-Modified，未变化时服务器返回304
+            headers = dict(self.headers, **self.http_cache.conditional_headers(url))
+        host = parse_url(url).netloc
+        # 由_open重试时，urllib3原本重试的连接错误、超时和状态码在这里重试
+        retries = self.retries if self._manual_retry else 0
+        retry_status = RETRY_STATUS + (() if self.rate_limiter else THROTTLE_STATUS)
+        throttles = 0
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire(host)
+            take_connect_time()
+            start = time.perf_counter()
+            timeout = self._request_timeout()
+            try:
+                response = self.session.get(
+                    url, 
+                    headers=headers, 
+                    timeout=timeout, 
+                    verify=False,
+                    allow_redirects=True,
+                    stream=True
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if self.rate_limiter and isinstance(e, requests.exceptions.Timeout):
+                    # 超时视为延迟升高
+                    self.rate_limiter.report(host, latency=timeout[1])
+                if attempt < retries and self._retry_wait(attempt):
+                    attempt += 1
+                    continue
+                raise
+            profiler = get_profiler()
+            if profiler.enabled:
+                # 新建连接的时间计入connect，其余的等待时间为TTFB
+                connect = take_connect_time()
+                profiler.record("fetch.connect", start, connect, url)
+                profiler.record("fetch.ttfb", start + connect,
+                                max(0.0, response.elapsed.total_seconds() - connect), url)
+            if self.rate_limiter:
+                self.rate_limiter.report(
+                    host, response.status_code, response.elapsed.total_seconds(), response.headers.get("Retry-After")
+                )
+                if response.status_code in THROTTLE_STATUS and throttles < config.RATE_LIMIT_RETRIES \
+                        and not self.expired():
+                    # 限速器已按Retry-After和退避推迟该主机的下一个请求
+                    throttles += 1
+                    response.close()
+                    warning_print(f"{url} 返回 {response.status_code}，降低请求速率后重试")
+                    continue
+            if response.status_code in retry_status and attempt < retries:
+                response.close()
+                if self._retry_wait(attempt, response.headers.get("Retry-After")):
+                    attempt += 1
+                    continue
+                return None, None
+            break
+        if response.status_code == 304 and self.http_cache:
+            cached = self.http_cache.load(url)
+            if cached is not None:
+                response.close()
+                return None, cached
         try:
-            response = self.session.get(
-                url, 
-                headers=self.headers, 
-                timeout=self.timeout, 
-                verify=False,
-                allow_redirects=True
-            )
             response.raise_for_status()  # 抛出HTTP错误
-            return response.content.decode("utf-8", "ignore")
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        
+        # 读取响应体之前按Content-Type过滤二进制资源
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if check_type and content_type and content_type.startswith(tuple(config.SKIP_CONTENT_TYPES)):
+            response.close()
+            warning_print(f"跳过 {url}: 内容类型为 {content_type}")
+            return None, None
+        return response, None
+    
+    def _iter_body(self, url, response):
+        """分块读取响应体，超过大小上限时截断
+        
+        压缩传输（gzip/deflate/br）的响应体由urllib3边读边解压，大小上限作用于解压后的字节数
+        """
+        received = 0
+        with self._reading_lock:
+            self._reading.add(response)
+        try:
+            for chunk in response.iter_content(chunk_size=config.STREAM_CHUNK_SIZE):
+                if self.expired():
+                    warning_print(f"{url} 超过目标的时间上限，停止读取")
+                    return
+                if received + len(chunk) > self.max_body_size:
+                    chunk = chunk[:self.max_body_size - received]
+                    received += len(chunk)
+                    yield chunk
+                    warning_print(f"{url} 超过大小上限 {self.max_body_size} 字节，已截断")
+                    return
+                received += len(chunk)
+                yield chunk
+        finally:
+            with self._reading_lock:
+                self._reading.discard(response)
+            # raw.tell()为实际从网络读取的（压缩后的）字节数
+            self.connection_stats.add_transfer(response.raw.tell(), received)
+    
+    def fetch_body(self, url):
+        """获取URL的原始响应体，返回 (bytes, 字符集)，失败或跳过时返回 (None, None)"""
+        try:
+            response, cached = self._open(url)
+            if cached is not None:
+                body, content_type = cached
+                return body, content_charset(content_type)
+            if response is None:
+                return None, None
+            with response:
+                body = b"".join(get_profiler().timed_iter(self._iter_body(url, response), "fetch.body", url))
+            # 截断的响应体不写入HTTP缓存
+            if self.http_cache and len(body) < self.max_body_size and not self.expired():
+                self.http_cache.store(url, response.headers, body)
+            return body, content_charset(response.headers.get("Content-Type"))
         except requests.exceptions.RequestException as e:
             error_print(f"获取 {url} 内容失败: {str(e)}")
+            return None, None
+    
+    def fetch_content(self, url):
+        """获取URL内容，按响应头中的字符集解码"""
+        body, charset = self.fetch_body(url)
+        if body is None:
+            return None
+        return body.decode(charset, "ignore")
+    
+    def iter_chunks(self, url, check_type=True):
+        """流式获取URL内容，逐块产出解码后的文本，整个响应体不需要同时驻留内存
+        
+        check_type为False时不按Content-Type跳过（Source Map常以application/octet-stream返回）；
+        启用HTTP缓存时响应体同时写入暂存文件，完整读取后再写入缓存
+        """
+        try:
+            response, cached = self._open(url, check_type)
+            if cached is not None:
+                body, content_type = cached
+                size = config.STREAM_CHUNK_SIZE
+                yield from self._decode_chunks(
+                    (body[start:start + size] for start in range(0, len(body), size)), content_charset(content_type)
+                )
+                return
+            if response is None:
+                return
+            charset = content_charset(response.headers.get("Content-Type"))
+            spool = self._cache_spool(response)
+            with response:
+                chunks = get_profiler().timed_iter(self._iter_body(url, response), "fetch.body", url)
+                if spool is None:
+                    yield from self._decode_chunks(chunks, charset)
+                    return
+                with spool:
+                    yield from self._decode_chunks(self._tee(chunks, spool), charset)
+                    # 截断或超时中止的响应体不写入HTTP缓存
+                    if spool.tell() < self.max_body_size and not self.expired():
+                        spool.seek(0)
+                        self.http_cache.store(url, response.headers, spool.read())
+        except requests.exceptions.RequestException as e:
+            error_print(f"获取 {url} 内容失败: {str(e)}")
+    
+    def _decode_chunks(self, chunks, charset):
+        """增量解码字节块，多字节字符被切分在两个块之间时也能正确解码"""
+        decoder = codecs.getincrementaldecoder(charset)("ignore")
+        for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+    
+    def _cache_spool(self, response):
+        """响应可以写入HTTP缓存（带有ETag或Last-Modified）时返回暂存响应体的临时文件，否则返回None
+        
+        不超过config.HTTP_CACHE_SPOOL_SIZE时暂存在内存中，更大的响应体写入磁盘
+        """
+        if not self.http_cache or not (response.headers.get("ETag") or response.headers.get("Last-Modified")):
             return None
+        return tempfile.SpooledTemporaryFile(max_size=config.HTTP_CACHE_SPOOL_SIZE)
+    
+    @staticmethod
+    def _tee(chunks, spool):
+        """原样产出字节块，同时写入暂存文件"""
+        for chunk in chunks:
+            spool.write(chunk)
+            yield chunk
     
-    def get_scripts(self, url, html_content=None):
-        """从HTML中提取所有脚本内容和外部脚本URL"""
+    def parse_page(self, html_content, url=None):
+        """解析HTML，同一份内容只解析一次，供脚本、样式表、元素和链接提取共用"""
+        cached_html, cached_page = self._parsed_page
+        if cached_html is html_content:
+            return cached_page
+        with get_profiler().span("parse", url):
+            page = ParsedPage(html_content, self.parser)
+        self._parsed_page = (html_content, page)
+        return page
+    
+    def get_scripts(self, url, html_content=None, scan=None):
+        """从HTML中提取所有脚本内容和外部脚本URL
+        
+        scan为流式扫描函数（接收文本块迭代器，返回扫描结果），给出时外部脚本在获取线程中边下载边扫描，
+        结果中外部脚本的值为扫描结果，完整内容不驻留内存
+        """
         if not html_content:
             html_content = self.fetch_content(url)
             if not html_content:
                 return {}
 
-        soup = BeautifulSoup(html_content, "html.parser")
-        scripts = soup.find_all("script")
+        page = self.parse_page(html_content, url)
         script_contents = {}
 
         # 内联脚本
-        inline_script = ""
-        for script in scripts:
-            if not script.get("src"):
-                inline_script += script.get_text() + "\n\n"
+        inline_script = "".join(text + "\n\n" for text in page.inline_scripts)
 
         if inline_script:
             script_contents[url + "#inline-script"] = inline_script
 
         # 外部脚本
-        for script in scripts:
-            src = script.get("src")
-            if src:
-                script_url = process_url(url, src)
-                if script_url and script_url not in self.external_scripts:
-                    self.external_scripts.add(script_url)
-                    color_print(f"发现外部脚本: {script_url}")
-                    script_content = self.fetch_content(script_url)
-                    if script_content:
-                        script_contents[script_url] = script_content
+        script_urls = []
+        for src in page.script_srcs:
+            script_url = process_url(url, src)
+            if script_url and script_url not in self.external_scripts:
+                self.external_scripts.add(script_url)
+                color_print(f"发现外部脚本: {script_url}")
+                script_urls.append(script_url)
 
+        if scan is None:
+            for script_url, script_content in self.engine.iter_fetch(script_urls):
+                if script_content:
+                    script_contents[script_url] = script_content
+            texts = script_contents
+        else:
+            # 只保留脚本末尾，用于查找sourceMappingURL
+            texts = {}
+            fetched = self.engine.iter_fetch(script_urls, lambda script_url: self._scan_script(script_url, scan))
+            for script_url, (result, tail) in fetched:
+                if tail:
+                    script_contents[script_url] = result
+                    texts[script_url] = tail
+
+        if self.source_maps:
+            script_contents = self._expand_source_maps(script_contents, script_urls, texts)
         return script_contents
+    
+    def _scan_script(self, script_url, scan):
+        """边下载边扫描外部脚本，返回 (扫描结果, 脚本末尾的文本)，获取失败时末尾为空"""
+        tail = ScriptTail(self.iter_chunks(script_url))
+        return scan(tail), tail.text
+    
+    def _expand_source_maps(self, script_contents, script_urls, texts):
+        """在外部脚本之后加入其Source Map中的原始源码，原始源码完整覆盖脚本时不再扫描压缩后的脚本
+        
+        texts为外部脚本的内容（或其末尾），用于查找sourceMappingURL
+        """
+        map_urls = {}
+        for script_url in script_urls:
+            map_url = self.source_map_url(script_url, texts.get(script_url))
+            if map_url:
+                map_urls[script_url] = map_url
+        if not map_urls:
+            return script_contents
+        
+        results = dict(self.engine.iter_fetch(list(dict.fromkeys(map_urls.values())), self.read_source_map))
+        expanded = {}
+        for script_url, script_content in script_contents.items():
+            map_url = map_urls.get(script_url)
+            if map_url is None:
+                expanded[script_url] = script_content
+                continue
+            sources, complete = self._take_sources(script_url, map_url, results.pop(map_url, None))
+            if not complete:
+                expanded[script_url] = script_content
+            expanded.update(sources)
+        return expanded
+    
+    def get_source_map(self, script_url, script_content):
+        """获取脚本的Source Map，返回 ({来源: 原始源码}, 是否完整覆盖脚本)，没有Source Map时返回 ({}, False)"""
+        map_url = self.source_map_url(script_url, script_content)
+        if not map_url:
+            return {}, False
+        return self._take_sources(script_url, map_url, self.read_source_map(map_url))
+    
+    def source_map_url(self, script_url, script_content):
+        """脚本末尾sourceMappingURL注释引用的地址（相对地址按脚本URL解析），没有时返回None"""
+        if not script_content:
+            return None
+        reference = find_reference(script_content)
+        if not reference:
+            return None
+        if reference.startswith("data:"):
+            return reference
+        return process_url(script_url, reference)
+    
+    def read_source_map(self, map_url):
+        """获取并流式解析Source Map，返回 ([(源文件名, 源码)], 是否完整覆盖脚本, 排除的依赖数)，失败时返回None
+        
+        路径包含config.SOURCE_MAP_EXCLUDE中片段（默认node_modules/）的第三方源码不解析，直接跳过
+        """
+        if map_url.startswith("data:"):
+            text = decode_data_url(map_url)
+            chunks = iter([text] if text else [])
+        else:
+            chunks = self.iter_chunks(map_url, check_type=False)
+        first = next(chunks, None)
+        if first is None:
+            return None
+        reader = SourceMapReader(itertools.chain([first], chunks))
+        try:
+            sources = list(reader.iter_sources(skip=is_excluded))
+        except ValueError as e:
+            warning_print(f"解析Source Map失败 {map_url[:200]}: {str(e)}")
+            return None
+        return sources, reader.complete, reader.excluded
+    
+    def _take_sources(self, script_url, map_url, result):
+        """去掉已扫描过的原始源码，返回 ({来源: 原始源码}, 是否完整覆盖脚本)"""
+        if result is None:
+            return {}, False
+        sources, complete, excluded = result
+        label = script_url + "#sourcemap" if map_url.startswith("data:") else map_url
+        taken = {}
+        duplicates = 0
+        for index, (name, content) in enumerate(sources):
+            digest = content_hash(content)
+            if digest in self.seen_sources:
+                duplicates += 1
+                continue
+            self.seen_sources.add(digest)
+            taken[f"{label}#{name or index}"] = content
+        color_print(f"从Source Map {label} 获取 {len(taken)} 个源文件，"
+                    f"跳过 {excluded} 个依赖和 {duplicates} 个重复的源文件")
+        return taken, complete
 
     def get_stylesheets(self, url, html_content=None):
         """从HTML中提取所有样式表内容和外部样式表URL"""
@@ -76,30 +465,27 @@ class Crawler:
             if not html_content:
                 return {}
 
-        soup = BeautifulSoup(html_content, "html.parser")
-        stylesheets = soup.find_all("link", rel="stylesheet")
+        page = self.parse_page(html_content, url)
         style_contents = {}
 
         # 内联样式
-        style_tags = soup.find_all("style")
-        inline_style = ""
-        for style in style_tags:
-            inline_style += style.get_text() + "\n\n"
+        inline_style = "".join(text + "\n\n" for text in page.inline_styles)
 
         if inline_style:
             style_contents[url + "#inline-style"] = inline_style
 
         # 外部样式表
-        for stylesheet in stylesheets:
-            href = stylesheet.get("href")
-            if href:
-                style_url = process_url(url, href)
-                if style_url and style_url not in self.external_stylesheets:
-                    self.external_stylesheets.add(style_url)
-                    color_print(f"发现外部样式表: {style_url}")
-                    style_content = self.fetch_content(style_url)
-                    if style_content:
-                        style_contents[style_url] = style_content
+        style_urls = []
+        for href in page.stylesheet_hrefs:
+            style_url = process_url(url, href)
+            if style_url and style_url not in self.external_stylesheets:
+                self.external_stylesheets.add(style_url)
+                color_print(f"发现外部样式表: {style_url}")
+                style_urls.append(style_url)
+
+        for style_url, style_content in self.engine.iter_fetch(style_urls):
+            if style_content:
+                style_contents[style_url] = style_content
 
         return style_contents
 
@@ -110,27 +496,20 @@ class Crawler:
             if not html_content:
                 return []
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        page = self.parse_page(html_content, url)
         elements_with_api = []
 
         # 提取表单action
-        forms = soup.find_all("form")
-        for form in forms:
-            action = form.get("action")
-            if action:
-                elements_with_api.append(("form_action", process_url(url, action)))
+        for action in page.form_actions:
+            elements_with_api.append(("form_action", process_url(url, action)))
 
         # 提取data-api属性
-        for tag in soup.find_all(lambda t: t.has_attr("data-api")):
-            api_url = tag["data-api"]
-            if api_url:
-                elements_with_api.append(("data_api", process_url(url, api_url)))
+        for api_url in page.data_apis:
+            elements_with_api.append(("data_api", process_url(url, api_url)))
 
         # 提取其他可能包含API的属性
-        for tag in soup.find_all(lambda t: t.has_attr("data-url")):
-            data_url = tag["data-url"]
-            if data_url:
-                elements_with_api.append(("data_url", process_url(url, data_url)))
+        for data_url in page.data_urls:
+            elements_with_api.append(("data_url", process_url(url, data_url)))
 
         return elements_with_api
     
@@ -141,48 +520,125 @@ class Crawler:
             if not html_content:
                 return []
         
-        soup = BeautifulSoup(html_content, "html.parser")
+        page = self.parse_page(html_content, url)
         links = []
+        seen = set()
         
-        for a_tag in soup.find_all("a"):
-            href = a_tag.get("href")
-            if href:
-                full_url = process_url(url, href)
-                if full_url and full_url not in links:
-                    links.append(full_url)
+        for href in page.anchors:
+            full_url = process_url(url, href)
+            if full_url and full_url not in seen:
+                seen.add(full_url)
+                links.append(full_url)
         
         return links
     
-    def deep_crawl(self, start_url, max_depth=config.MAX_DEPTH, max_urls=config.MAX_URLS):
-        """深度爬取网站"""
+    def crawl_pages(self, start_url, max_depth=None, max_urls=None, state=None):
+        """深度爬取网站，每获取一个页面立即产出 (url, html_content)，同时完成链接发现
+        
+        state为crawl_state()保存的状态，给出时从该状态继续爬取
+        """
+        if max_depth is None:
+            max_depth = config.MAX_DEPTH
+        if max_urls is None:
+            max_urls = config.MAX_URLS
         color_print(f"开始深度爬取: {start_url} (最大深度: {max_depth})")
         
-        crawl_queue = [(start_url, 1)]  # (url, depth)
-        all_links = []
+        if state:
+            frontier = self._restore_crawl_state(state)
+        else:
+            # 已访问集合中的URL都是规范化形式，起始URL同样规范化，避免被重复爬取
+            frontier = CrawlFrontier(normalize_url(start_url))
+        self._frontier = frontier
         
-        while crawl_queue and len(self.visited_urls) < max_urls:
-            url, depth = crawl_queue.pop(0)
-            
-            if url in self.visited_urls:
-                continue
-                
-            if depth > max_depth:
-                continue
+        while frontier and len(self.visited_urls) < max_urls and not self.expired():
+            # 取出同一深度的一批URL并发获取，保持广度优先的顺序
+            batch = []
+            batch_depth = frontier.next_depth()
+            while frontier and frontier.next_depth() == batch_depth and len(self.visited_urls) < max_urls:
+                url, depth = frontier.pop()
                 
-            self.visited_urls.add(url)
-            color_print(f"正在爬取: {url} (深度: {depth})")
+                if url in self.visited_urls:
+                    continue
+                    
+                if depth > max_depth:
+                    continue
+                    
+                # 先记入待产出列表再标记为已访问，检查点中的状态始终一致
+                self._pending.append((url, depth))
+                self.visited_urls.add(url)
+                color_print(f"正在爬取: {url} (深度: {depth})")
+                batch.append(url)
             
             # 获取页面内容
-            html_content = self.fetch_content(url)
-            if not html_content:
-                continue
+            for url, html_content in self._iter_parsed(self.engine.iter_fetch(batch)):
+                # 查找页面中的链接
+                page_links = self.find_links(url, html_content)
+                for link in page_links:
+                    if link not in self.visited_urls:
+                        frontier.push(link, batch_depth + 1)
                 
-            # 查找页面中的链接
-            page_links = self.find_links(url, html_content)
-            for link in page_links:
-                if link not in self.visited_urls and link not in [u for u, d in crawl_queue]:
-                    all_links.append(link)
-                    crawl_queue.append((link, depth + 1))
+                # 该页面及之前获取失败的页面都已处理完毕
+                while self._pending and self._pending.popleft()[0] != url:
+                    pass
+                yield url, html_content
+            self._pending.clear()
         
         color_print(f"深度爬取完成，共访问 {len(self.visited_urls)} 个URL")
+
+    def crawl_state(self):
+        """当前的爬取状态，已访问但尚未产出的页面放回队首，恢复后重新获取"""
+        pending = {url for url, _ in self._pending}
+        return {
+            "queue": [list(item) for item in self._pending] + [list(item) for item in self._frontier.queue],
+            "seen": list(self._frontier.seen),
+            "visited": [url for url in self.visited_urls if url not in pending],
+            "external_scripts": list(self.external_scripts),
+            "external_stylesheets": list(self.external_stylesheets),
+        }
+
+    def _restore_crawl_state(self, state):
+        """从crawl_state()保存的状态恢复已访问集合，返回恢复后的爬取队列"""
+        self.visited_urls.update(state["visited"])
+        self.external_scripts.update(state["external_scripts"])
+        self.external_stylesheets.update(state["external_stylesheets"])
+        frontier = CrawlFrontier()
+        frontier.seen.update(state["seen"])
+        frontier.queue.extend((url, depth) for url, depth in state["queue"])
+        return frontier
+
+    def _iter_parsed(self, fetched):
+        """有进程池时把获取到的页面提前提交到子进程解析，按原顺序产出 (url, html_content)"""
+        if self.pool is None:
+            for url, html_content in fetched:
+                if html_content:
+                    yield url, html_content
+            return
+        
+        pending = deque()
+        for url, html_content in fetched:
+            if html_content:
+                pending.append((url, html_content, self.pool.submit_parse(html_content, self.parser)))
+            # 限制预解析的页面数量
+            while len(pending) > self.pool.workers * 2:
+                yield self._take_parsed(pending.popleft())
+        while pending:
+            yield self._take_parsed(pending.popleft())
+    
+    def _take_parsed(self, entry):
+        """取回子进程的解析结果并放入页面解析缓存"""
+        url, html_content, future = entry
+        with get_profiler().span("parse.pool", url):
+            page = future.result()
+        self._parsed_page = (html_content, page)
+        return url, html_content
+    
+    def deep_crawl(self, start_url, max_depth=None, max_urls=None):
+        """深度爬取网站，返回所有访问过的URL"""
+        for _ in self.crawl_pages(start_url, max_depth=max_depth, max_urls=max_urls):
+            pass
         return list(self.visited_urls)
+
+    def close(self):
+        """释放并发获取引擎占用的线程并关闭连接池"""
+        self.engine.close()
+        self.session.close()
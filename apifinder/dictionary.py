@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+import config
+
+# 原始内容中对应“简化内容”里一个空格的字符
+_SPACE_CLASS = "[ \"']"
+# 字典缓存文件的格式版本，DictionaryMatcher的编译方式变化时需要递增
+ARTIFACT_VERSION = 1
+
+def build_trie_regex(words):
+    """将正则片段序列的集合构造为前缀树形式的正则，公共前缀只比较一次"""
+    trie = {}
+    for word in words:
+        node = trie
+        for token in word:
+            node = node.setdefault(token, {})
+        node[""] = {}  # 单词结束标记
+    return _trie_to_regex(trie)
+
+def _trie_to_regex(node):
+    """递归生成前缀树节点对应的正则片段"""
+    alternatives = [token + _trie_to_regex(child) for token, child in sorted(node.items()) if token]
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    if "" in node:
+        # 贪婪可选，优先尝试更长的单词
+        return "(?:" + body + ")?"
+    return body
+
+def _literal_tokens(word):
+    """字面量逐字符转义为正则片段"""
+    return [re.escape(char) for char in word]
+
+def _translate_pattern(key):
+    """将作用于简化内容（引号替换为空格、斜杠替换为 " / "）的模式翻译为直接作用于原始内容的正则片段
+    
+    简化内容中的斜杠两侧总是空格，模式中的 " / " 对应原始内容的 "/"，其余空格对应原始的空格或引号；
+    在简化内容中不可能命中的模式（含引号、斜杠两侧不是空格、以斜杠开头或结尾）返回None
+    """
+    if '"' in key or "'" in key:
+        return None
+    tokens = []
+    i = 0
+    while i < len(key):
+        if key.startswith(" / ", i):
+            tokens.append("/")
+            i += 3
+        elif key[i] == "/":
+            return None
+        else:
+            tokens.append(_SPACE_CLASS if key[i] == " " else re.escape(key[i]))
+            i += 1
+    return tokens
+
+def _simplify(text):
+    """将原始内容中命中的片段转换为简化内容的形式，用于映射回字典模式"""
+    return text.replace('"', ' ').replace("'", ' ').replace('/', ' / ')
+
+class DictionaryMatcher:
+    """API字典的多模式匹配器，一次扫描即可得到所有命中的字典模式"""
+
+    def __init__(self, patterns):
+        """编译字典：内容匹配不区分大小写并要求单词边界，路径匹配为区分大小写的子串匹配"""
+        self._tokens = {}
+        for key in {pattern.lower() for pattern in patterns}:
+            tokens = _translate_pattern(key)
+            if tokens:
+                self._tokens[key] = tokens
+        self.keys = sorted(self._tokens)  # 可能在内容中命中的模式
+        self._key_set = set(self.keys)
+        self._content_regex = None
+        self._path_regex = None
+        self._single_regex = {}
+        # 每个模式的真前缀模式，同一位置可能同时命中
+        self._prefixes = {}
+        if patterns:
+            self._path_regex = re.compile(build_trie_regex(_literal_tokens(p) for p in set(patterns)))
+        if not self.keys:
+            return
+
+        trie = build_trie_regex(self._tokens[key] for key in self.keys)
+        self._content_regex = re.compile(r"(?=\b(" + trie + r")\b)", re.IGNORECASE)
+        for key in self.keys:
+            prefixes = [key[:i] for i in range(1, len(key)) if key[:i] in self._key_set]
+            if prefixes:
+                self._prefixes[key] = prefixes
+
+    def get_state(self):
+        """导出编译结果（正则源码而非编译后的对象），用于保存字典缓存"""
+        return {
+            "tokens": self._tokens,
+            "prefixes": self._prefixes,
+            "content": self._content_regex.pattern if self._content_regex else None,
+            "path": self._path_regex.pattern if self._path_regex else None,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """从get_state的结果恢复，跳过前缀树的构造"""
+        matcher = cls.__new__(cls)
+        matcher._tokens = state["tokens"]
+        matcher.keys = sorted(matcher._tokens)
+        matcher._key_set = set(matcher.keys)
+        matcher._prefixes = state["prefixes"]
+        matcher._single_regex = {}
+        matcher._content_regex = re.compile(state["content"], re.IGNORECASE) if state["content"] else None
+        matcher._path_regex = re.compile(state["path"]) if state["path"] else None
+        return matcher
+
+    def _single(self, key):
+        """单个模式的正则，用于验证同一位置上被更长模式遮挡的前缀模式"""
+        regex = self._single_regex.get(key)
+        if regex is None:
+            regex = self._single_regex[key] = re.compile(
+                r"\b" + "".join(self._tokens[key]) + r"\b", re.IGNORECASE
+            )
+        return regex
+
+    def find_in_content(self, content, pos=0, stop=None):
+        """单次扫描原始内容，不生成任何副本，返回命中的模式集合（小写形式）
+        
+        pos之前的内容只作为单词边界的上下文，stop之后开始的匹配不计入
+        """
+        found = set()
+        if self._content_regex is None or not content:
+            return found
+
+        for match in self._content_regex.finditer(content, pos):
+            if stop is not None and match.start() >= stop:
+                break
+            text = match.group(1)
+            key = _simplify(text).lower()
+            if key not in self._key_set:
+                # 大小写折叠与lower()不一致的罕见字符，逐个模式核对
+                found.update(k for k in self.keys if self._single(k).fullmatch(text))
+                continue
+            found.add(key)
+            for prefix in self._prefixes.get(key, ()):
+                if prefix not in found and self._single(prefix).match(content, match.start()):
+                    found.add(prefix)
+            if len(found) == len(self.keys):
+                break
+        return found
+
+    def match_path(self, path):
+        """判断路径中是否包含任意字典模式"""
+        if self._path_regex is None or not path:
+            return False
+        return self._path_regex.search(path) is not None
+
+class APIDictionary(list):
+    """API路径字典，加载时即编译为多模式匹配器"""
+
+    def __init__(self, patterns=(), matcher=None):
+        super().__init__(patterns)
+        self.matcher = DictionaryMatcher(self) if matcher is None else matcher
+
+@lru_cache(maxsize=16)
+def _compile_patterns(patterns):
+    """为普通列表形式的字典编译匹配器"""
+    return DictionaryMatcher(patterns)
+
+def get_matcher(api_patterns):
+    """获取字典对应的匹配器"""
+    if isinstance(api_patterns, APIDictionary):
+        return api_patterns.matcher
+    return _compile_patterns(tuple(api_patterns or ()))
+
+def _source_key(stat):
+    """字典文件的修改时间和大小，任一变化时缓存失效"""
+    return [stat.st_mtime_ns, stat.st_size]
+
+def artifact_path(file_path):
+    """字典文件对应的缓存路径，位于config.DICTIONARY_CACHE_DIR（默认为用户缓存目录）中，按字典文件的绝对路径区分"""
+    cache_dir = config.DICTIONARY_CACHE_DIR or os.path.join(
+        os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "apifinder"
+    )
+    digest = hashlib.blake2b(os.path.abspath(file_path).encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"dictionary-{digest}.json")
+
+def load_artifact(path, stat):
+    """读取字典缓存，字典文件已变化或缓存不可用时返回None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+        if artifact.get("version") != ARTIFACT_VERSION or artifact.get("source") != _source_key(stat):
+            return None
+        return APIDictionary(artifact["patterns"], DictionaryMatcher.from_state(artifact["matcher"]))
+    except (OSError, ValueError, KeyError, TypeError, re.error):
+        return None
+
+def save_artifact(path, stat, dictionary):
+    """保存字典缓存，写入失败（如目录只读）时静默忽略"""
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "source": _source_key(stat),
+        "patterns": list(dictionary),
+        "matcher": dictionary.matcher.get_state(),
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
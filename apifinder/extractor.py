@@ -1,54 +1,197 @@
 import re
 import config
 from urllib.parse import urlparse
+from .cache import content_hash
+from .dictionary import get_matcher
+from .matchers import get_matchers
+from .profiler import get_profiler
 from .utils import color_print, is_api_path, process_url
 
+class ScannedScript:
+    """边下载边扫描得到的候选结果，传给extract_apis_batch时不再扫描"""
+
+    def __init__(self, items):
+        self.items = items
+
 class APIExtractor:
     """API提取器类，负责从内容中提取API信息"""
     
-    def __init__(self, api_dictionary=None):
-        """初始化提取器，加载正则表达式和API字典"""
-        self.api_patterns = re.compile(config.API_REGEX_PATTERNS, re.VERBOSE | re.IGNORECASE)
+    def __init__(self, api_dictionary=None, cache=None, pool=None, matchers=None, found_apis=None):
+        """初始化提取器，加载正则表达式和API字典，matchers为启用的匹配器名称，默认使用config.MATCHERS
+        
+        found_apis为去重用的集合，默认为set()；不保存全部结果时可传入容量有限的LRUSet
+        """
+        self.matchers = get_matchers(matchers)  # 编译后的匹配器在进程内共享
         self.api_dictionary = api_dictionary or []
-        self.found_apis = set()  # 用于去重
+        self.dictionary_matcher = get_matcher(self.api_dictionary)
+        self.found_apis = set() if found_apis is None else found_apis  # 用于去重
         # 添加CSS URL匹配模式
         self.css_url_pattern = re.compile(r'url\(\s*[\'"]([^\'")]+)[\'"]?\s*\)', re.IGNORECASE)
+        # 提取结果缓存，键中包含提取配置的指纹，正则或字典变化后旧结果不会命中
+        self.cache = cache
+        self.pool = pool  # 多进程提取阶段(ExtractionPool)，为空时在当前进程扫描
+        self._fingerprint = content_hash(
+            "\n".join([self.matchers.fingerprint, self.css_url_pattern.pattern] + list(self.api_dictionary))
+        )
         
     def extract_apis(self, content, base_url=None):
         """从内容中提取API信息"""
         if not content:
             return []
             
-        api_info = []
-        matches = self.api_patterns.finditer(str(content))
+        return self._apply(self._scan_many("script", [content])[0])
+    
+    def extract_apis_batch(self, contents, base_url=None, labels=None):
+        """批量从多个脚本内容中提取API信息，有进程池时并行扫描，结果与逐个调用extract_apis一致
         
-        for match in matches:
-            group = match.group().strip('"').strip("'")
-            
-            # 检查HTTP方法
-            if group.upper() in ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"]:
-                api_info.append(("method", group.upper()))
-            
-            # 检查fetch/axios调用
-            elif match.group(3):
-                url = match.group(3)
-                if self._is_valid_api(url):
-                    api_info.append(("url", url))
-            
-            # 检查jQuery AJAX调用
-            elif match.group(4):
-                url = match.group(4)
-                if self._is_valid_api(url):
-                    api_info.append(("url", url))
-            
-            # 其他URL匹配
-            elif group and self._is_valid_api(group):
-                api_info.append(("url", group))
+        labels为各内容的名称（如脚本URL），用于性能分析；contents中的ScannedScript已扫描过，直接使用其结果
+        """
+        return [self._apply(items) for items in self._scan_many("script", contents, labels)]
+    
+    def scan_chunks(self, chunks):
+        """边读边扫描脚本文本块，返回ScannedScript，内存占用与脚本大小无关；不使用提取缓存"""
+        return ScannedScript([item for items in self._iter_chunk_items(chunks) for item in items])
+    
+    def scan(self, kind, content):
+        """扫描内容得到与去重状态无关的候选结果，kind为script或css"""
+        if not content:
+            return []
+        if kind == "css":
+            return self._scan_css(content)
+        return self._scan_script(content)
+    
+    def _scan_many(self, kind, contents, labels=None):
+        """批量扫描，有缓存时按内容哈希复用，未命中的内容有进程池时分发到子进程"""
+        results = [None] * len(contents)
+        keys = [None] * len(contents)
+        for i, content in enumerate(contents):
+            if isinstance(content, ScannedScript):
+                results[i] = content.items
+            elif self.cache is not None and content:
+                keys[i] = content_hash(content, kind + self._fingerprint)
+                results[i] = self.cache.get(keys[i])
+        
+        misses = [i for i, items in enumerate(results) if items is None]
+        profiler = get_profiler()
+        if self.pool is not None and misses:
+            with profiler.span("extract.pool"):
+                scanned = self.pool.scan_many(kind, [contents[i] for i in misses])
+        elif labels and profiler.enabled:
+            scanned = []
+            for i in misses:
+                with profiler.target(labels[i]):
+                    scanned.append(self.scan(kind, contents[i]))
+        else:
+            scanned = [self.scan(kind, contents[i]) for i in misses]
+        
+        for i, items in zip(misses, scanned):
+            results[i] = items
+            if keys[i] is not None:
+                self.cache.put(keys[i], items)
+        return results
+    
+    def _scan_script(self, content):
+        """用正则和字典扫描脚本内容，返回候选结果列表"""
+        items = []
+        with get_profiler().span("regex"):
+            for match in self.matchers.finditer(content):
+                items.append(self.matchers.item(match))
         
         # 如果有API字典，进行额外检查
         if self.api_dictionary:
-            self._check_dictionary_matches(content, api_info)
+            items.extend(self._dictionary_items(content))
             
+        return items
+    
+    def iter_apis(self, chunks, base_url=None):
+        """流式提取：消费文本块迭代器（如流式HTTP响应或打开的文件），边读边产出 ("url", ...)
+        
+        相邻窗口保留 config.STREAM_OVERLAP 个字符的重叠区，长度不超过重叠区的匹配不会因跨块边界而丢失，
+        结果与整体调用 extract_apis 一致；字典命中按字典顺序在末尾产出，内存占用与文件大小无关
+        """
+        api_info = []  # 已产出的结果，字典命中需要与其去重
+        for items in self._iter_chunk_items(chunks):
+            start = len(api_info)
+            self._apply(items, api_info, base_url)
+            yield from api_info[start:]
+    
+    def extract_apis_from_chunks(self, chunks, base_url=None):
+        """从文本块序列中提取API信息"""
+        return list(self.iter_apis(chunks, base_url))
+    
+    def _iter_chunk_items(self, chunks):
+        """按窗口扫描文本块，每个窗口产出一批候选结果"""
+        overlap = config.STREAM_OVERLAP
+        profiler = get_profiler()
+        matched = set()
+        buffer = ""
+        # 缓冲区中正则和字典尚未扫描的起点，起点前一个字符保留作单词边界的上下文
+        regex_start = dictionary_start = 0
+        carry = []
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) - dictionary_start < 2 * overlap:
+                continue
+            # 只接受起点落在重叠区之前的匹配，其余留到下一个窗口
+            cut = len(buffer) - overlap
+            keep = cut
+            items = []
+            with profiler.span("regex"):
+                for match in self.matchers.finditer(buffer, regex_start):
+                    if match.start() >= cut:
+                        break
+                    items.append(self.matchers.item(match))
+                    keep = max(keep, match.end())
+            if self.api_dictionary:
+                with profiler.span("dictionary"):
+                    matched |= self.dictionary_matcher.find_in_content(buffer, dictionary_start, stop=cut)
+            buffer = buffer[cut - 1:]
+            regex_start = keep - cut + 1
+            dictionary_start = 1
+            # 窗口末尾单独的method:留到下一批，与紧随其后的URL配对
+            items = carry + items
+            carry = [items.pop()] if items and items[-1][0] == "method" else []
+            if items:
+                yield items
+        
+        items = carry
+        with profiler.span("regex"):
+            for match in self.matchers.finditer(buffer, regex_start):
+                items.append(self.matchers.item(match))
+        if self.api_dictionary:
+            with profiler.span("dictionary"):
+                matched |= self.dictionary_matcher.find_in_content(buffer, dictionary_start)
+            items.extend(("dictionary", pattern) for pattern in self.api_dictionary if pattern.lower() in matched)
+        yield items
+    
+    def _apply(self, items, api_info=None, base_url=None):
+        """按顺序校验候选结果并去重，得到最终的API信息
+        
+        URL带有方法时结果为 ("url", URL, 方法)；单独出现的method:只用于紧随其后的候选URL，否则丢弃
+        """
+        if api_info is None:
+            api_info = []
+        pending = None
+        for item in items:
+            kind, value = item[0], item[1]
+            method = item[2] if len(item) > 2 else pending
+            pending = None
+            if kind == "method":
+                pending = value
+            elif kind == "candidate":
+                if self._is_valid_api(value):
+                    api_info.append(("url", value, method) if method else ("url", value))
+            elif kind == "css_url":
+                if self._is_valid_api(value):
+                    # 处理相对URL
+                    if base_url and not value.startswith(('http://', 'https://')):
+                        value = process_url(base_url, value)
+                    api_info.append(("url", value))
+            elif kind == "dictionary":
+                # 确保不添加重复项
+                if not any(item[0] == "url" and item[1] == value for item in api_info):
+                    api_info.append(("url", value))
+                    self.found_apis.add(value)
         return api_info
     
     def _is_valid_api(self, url):
@@ -74,19 +217,18 @@ class APIExtractor:
             
         return False
     
+    def _dictionary_items(self, content):
+        """使用字典检查内容中的API路径，按字典顺序返回候选结果"""
+        # 一次扫描原始内容得到所有命中的字典模式
+        with get_profiler().span("dictionary"):
+            matched = self.dictionary_matcher.find_in_content(content)
+        if not matched:
+            return []
+        return [("dictionary", pattern) for pattern in self.api_dictionary if pattern.lower() in matched]
+    
     def _check_dictionary_matches(self, content, api_info):
         """使用字典检查内容中的API路径"""
-        # 简化内容，便于匹配
-        simplified_content = content.replace('"', ' ').replace("'", ' ').replace('/', ' / ')
-
-        for pattern in self.api_dictionary:
-            # 创建匹配模式，考虑前后可能的字符
-            regex_pattern = r'\b' + re.escape(pattern) + r'\b'
-            if re.search(regex_pattern, simplified_content, re.IGNORECASE):
-                # 确保不添加重复项
-                if not any(item[0] == "url" and item[1] == pattern for item in api_info):
-                    api_info.append(("url", pattern))
-                    self.found_apis.add(pattern)
+        self._apply(self._dictionary_items(content), api_info)
 
     def extract_apis_from_html_elements(self, elements, base_url=None):
         """从HTML元素中提取API信息"""
@@ -98,21 +240,22 @@ class APIExtractor:
 
     def extract_apis_from_css(self, css_content, base_url=None):
         """从CSS内容中提取API信息"""
-        api_info = []
         if not css_content:
-            return api_info
+            return []
+
+        return self._apply(self._scan_many("css", [css_content])[0], base_url=base_url)
 
+    def extract_apis_from_css_batch(self, contents, base_url=None, labels=None):
+        """批量从多个CSS内容中提取API信息"""
+        return [self._apply(items, base_url=base_url) for items in self._scan_many("css", contents, labels)]
+
+    def _scan_css(self, css_content):
+        """扫描CSS内容，返回候选结果列表"""
         # 匹配CSS中的URL
-        matches = self.css_url_pattern.finditer(css_content)
-        for match in matches:
-            url = match.group(1)
-            if url and self._is_valid_api(url):
-                # 处理相对URL
-                if base_url and not url.startswith(('http://', 'https://')):
-                    url = process_url(base_url, url)
-                api_info.append(("url", url))
+        with get_profiler().span("regex"):
+            items = [("css_url", match.group(1)) for match in self.css_url_pattern.finditer(css_content)]
 
         # 检查CSS中的API字典匹配
-        self._check_dictionary_matches(css_content, api_info)
+        items.extend(self._dictionary_items(css_content))
 
-        return api_info
+        return items
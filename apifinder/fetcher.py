@@ -0,0 +1,83 @@
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import config
+from .urlnorm import parse_url
+
+class FetchEngine:
+    """并发获取引擎，限制全局并发数和单个主机的并发数"""
+
+    def __init__(self, fetch_func, concurrency=None, per_host=None):
+        """初始化获取引擎，fetch_func为实际执行单次请求的函数"""
+        self.fetch_func = fetch_func
+        self.concurrency = max(1, concurrency or config.CONCURRENCY)
+        self.per_host = max(1, per_host or config.PER_HOST_CONCURRENCY)
+        self._executor = None
+        self._host_active = defaultdict(int)  # 每个主机已提交但未完成的请求数
+        self._condition = threading.Condition()
+
+    def _get_executor(self):
+        """延迟创建线程池"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency,
+                thread_name_prefix="apifinder-fetch"
+            )
+        return self._executor
+
+    def _on_done(self, host):
+        """请求完成后释放主机并发名额"""
+        with self._condition:
+            self._host_active[host] -= 1
+            self._condition.notify_all()
+
+    def _try_submit(self, fetch_func, url, host):
+        """主机并发未满时提交请求，否则返回None（调用方需持有锁）"""
+        if self._host_active[host] >= self.per_host:
+            return None
+        self._host_active[host] += 1
+        future = self._get_executor().submit(fetch_func, url)
+        future.add_done_callback(lambda _: self._on_done(host))
+        return future
+
+    def iter_fetch(self, urls, fetch_func=None):
+        """并发获取多个URL，按输入顺序逐个产出 (url, content)，fetch_func默认为初始化时给出的函数"""
+        fetch_func = fetch_func or self.fetch_func
+        urls = list(urls)
+        if self.concurrency == 1 or len(urls) <= 1:
+            for url in urls:
+                yield url, fetch_func(url)
+            return
+
+        hosts = [parse_url(url).netloc for url in urls]
+        futures = [None] * len(urls)
+        pending = list(range(len(urls)))
+        # 预取窗口，限制已完成但尚未产出的结果数量
+        window = self.concurrency * 2
+
+        for i, url in enumerate(urls):
+            with self._condition:
+                while True:
+                    remaining = []
+                    for index in pending:
+                        if index < i + window and futures[index] is None:
+                            futures[index] = self._try_submit(fetch_func, urls[index], hosts[index])
+                        if futures[index] is None:
+                            remaining.append(index)
+                    pending = remaining
+                    if futures[i] is not None and futures[i].done():
+                        break
+                    self._condition.wait()
+            content = futures[i].result()
+            futures[i] = None
+            yield url, content
+
+    def fetch_all(self, urls):
+        """并发获取多个URL，返回按输入顺序排列的 {url: content}"""
+        return dict(self.iter_fetch(urls))
+
+    def close(self):
+        """关闭线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,33 @@
+from collections import deque
+
+class CrawlFrontier:
+    """广度优先爬取队列，deque出队，集合判断URL是否已入队"""
+
+    def __init__(self, start_url=None, depth=1):
+        """初始化队列，可选放入起始URL"""
+        self.queue = deque()  # (url, depth)
+        self.seen = set()     # 所有入过队的URL
+        if start_url:
+            self.push(start_url, depth)
+
+    def push(self, url, depth):
+        """URL未入过队时加入队尾，返回是否加入"""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self.queue.append((url, depth))
+        return True
+
+    def pop(self):
+        """取出队首的 (url, depth)"""
+        return self.queue.popleft()
+
+    def next_depth(self):
+        """队首URL的深度"""
+        return self.queue[0][1]
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __bool__(self):
+        return bool(self.queue)
@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+
+class HTTPCache:
+    """持久化的HTTP条件请求缓存，保存响应体、Content-Type及其ETag/Last-Modified校验信息"""
+
+    def __init__(self, path):
+        """打开或创建SQLite缓存文件"""
+        self.path = path
+        self.revalidated = 0  # 服务器返回304、直接使用本地副本的次数
+        self.stored = 0       # 写入或更新的响应数
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB NOT NULL, content_type TEXT)"
+        )
+        # 旧版本创建的缓存文件没有content_type列
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+        if "content_type" not in columns:
+            self._db.execute("ALTER TABLE responses ADD COLUMN content_type TEXT")
+
+    def conditional_headers(self, url):
+        """返回该URL的条件请求头，没有缓存时返回空字典"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        headers = {}
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def load(self, url):
+        """服务器返回304时读取本地保存的 (响应体, Content-Type)，响应体的字符集由Content-Type得出"""
+        with self._lock:
+            row = self._db.execute("SELECT body, content_type FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self.revalidated += 1
+        return bytes(row[0]), row[1]
+
+    def store(self, url, headers, body):
+        """保存带有校验信息的响应，没有ETag和Last-Modified的响应不缓存"""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, content_type) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, sqlite3.Binary(body), headers.get("Content-Type"))
+            )
+            self._db.commit()
+            self.stored += 1
+
+    def close(self):
+        """关闭缓存文件"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,72 @@
+import re
+from functools import lru_cache
+import config
+from . import prefilter
+
+# 匹配器正则的编译选项
+FLAGS = re.VERBOSE | re.IGNORECASE
+
+class MatcherSet:
+    """启用的API匹配器，合并为一个正则一次扫描
+
+    每个匹配器是合并正则中以其名称命名的分组，同一位置按config.API_MATCHERS中的顺序优先，
+    匹配结果互不重叠；命中的匹配器由match.lastgroup直接得出
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self._groups = {}  # 匹配器名称 -> (结果类型, 值所在分组的序号, 方法所在分组的序号列表)
+        parts = []
+        anchors = []
+        index = 1
+        for name in names:
+            kind, pattern, anchor = config.API_MATCHERS[name]
+            anchors.append(anchor)
+            parts.append(f"(?P<{name}>{pattern}\n)")
+            groups = re.compile(pattern, FLAGS).groups
+            self._groups[name] = (kind, index + 1, range(index + 2, index + 1 + groups))
+            index += 1 + groups
+        self.pattern = re.compile("|".join(parts), FLAGS) if parts else None
+        # 有匹配器没有锚点时整体退回普通扫描
+        self.unfiltered = [name for name, anchor in zip(names, anchors) if anchor is None]
+        self.prefilter = bool(config.REGEX_PREFILTER and parts) and not self.unfiltered
+        self.anchor = prefilter.compile_anchors(anchors) if self.prefilter else None
+        # 用于提取缓存的指纹，启用的匹配器或其正则变化后旧结果不会命中，锚点不影响结果
+        self.fingerprint = "\n".join(f"{name}={config.API_MATCHERS[name][:2]}" for name in names)
+
+    def finditer(self, content, pos=0):
+        """从pos开始查找所有匹配"""
+        if self.pattern is None:
+            return iter(())
+        if self.prefilter:
+            return prefilter.iter_matches(self.pattern, self.anchor, content, pos)
+        return self.pattern.finditer(content, pos)
+
+    def item(self, match):
+        """把一次匹配转换为 (结果类型, 值)，匹配到同一调用中的HTTP方法时为 (结果类型, 值, 方法)"""
+        kind, group, method_groups = self._groups[match.lastgroup]
+        value = match.group(group)
+        if kind == "method":
+            return (kind, value.upper())
+        for method_group in method_groups:
+            method = match.group(method_group)
+            if method:
+                return (kind, value, method.upper())
+        return (kind, value)
+
+def check_matchers(names):
+    """返回names中未在config.API_MATCHERS中定义的名称"""
+    return [name for name in names if name not in config.API_MATCHERS]
+
+@lru_cache(maxsize=16)
+def _compile(names):
+    return MatcherSet(names)
+
+def get_matchers(names=None):
+    """获取启用的匹配器，默认使用config.MATCHERS；同一组合在进程内只编译一次，由所有提取器共享"""
+    names = config.MATCHERS if names is None else names
+    unknown = check_matchers(names)
+    if unknown:
+        raise ValueError(f"未知的匹配器: {', '.join(unknown)}")
+    # 按注册顺序排列，与启用时的书写顺序无关
+    return _compile(tuple(name for name in config.API_MATCHERS if name in names))
@@ -0,0 +1,64 @@
+import config
+from .utils import warning_print
+
+# 支持的HTML解析后端
+PARSER_BACKENDS = ["html.parser", "lxml", "html5lib"]
+
+def resolve_parser(parser=None):
+    """检查解析后端是否可用，不可用时回退到内置的html.parser"""
+    parser = parser or config.HTML_PARSER
+    if parser == "html.parser":
+        return parser
+    from bs4 import BeautifulSoup, FeatureNotFound
+    try:
+        BeautifulSoup("", parser)
+        return parser
+    except FeatureNotFound:
+        warning_print(f"HTML解析后端 {parser} 不可用，将使用 html.parser")
+        return "html.parser"
+
+class ParsedPage:
+    """单次解析HTML得到的页面结构，一次遍历收集脚本、样式表、元素和链接"""
+
+    def __init__(self, html_content, parser="html.parser"):
+        """解析HTML并按文档顺序收集各类节点"""
+        # 延迟导入，只处理JS文件时无需加载bs4
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html_content, parser)
+        self.inline_scripts = []     # 内联脚本文本
+        self.script_srcs = []        # 外部脚本src
+        self.inline_styles = []      # 内联样式文本
+        self.stylesheet_hrefs = []   # 外部样式表href
+        self.form_actions = []       # 表单action
+        self.data_apis = []          # data-api属性
+        self.data_urls = []          # data-url属性
+        self.anchors = []            # 链接href
+
+        for tag in soup.find_all(True):
+            name = tag.name
+            if name == "script":
+                src = tag.get("src")
+                if src:
+                    self.script_srcs.append(src)
+                else:
+                    self.inline_scripts.append(tag.get_text())
+            elif name == "style":
+                self.inline_styles.append(tag.get_text())
+            elif name == "link":
+                if "stylesheet" in (tag.get("rel") or []):
+                    href = tag.get("href")
+                    if href:
+                        self.stylesheet_hrefs.append(href)
+            elif name == "form":
+                action = tag.get("action")
+                if action:
+                    self.form_actions.append(action)
+            elif name == "a":
+                href = tag.get("href")
+                if href:
+                    self.anchors.append(href)
+
+            if tag.has_attr("data-api") and tag["data-api"]:
+                self.data_apis.append(tag["data-api"])
+            if tag.has_attr("data-url") and tag["data-url"]:
+                self.data_urls.append(tag["data-url"])
@@ -0,0 +1,23 @@
+import re
+
+# 正则预过滤：先用各匹配器的锚点（config.API_MATCHERS中的第三项）查找候选起点，只在候选起点上运行完整正则
+# 锚点与匹配器正则一样忽略大小写，按位置依次查找，不复制内容，也不预先收集所有候选起点
+
+def compile_anchors(anchors):
+    """把各匹配器的锚点合并为一个正则"""
+    return re.compile("|".join(dict.fromkeys(anchors)), re.IGNORECASE)
+
+def iter_matches(pattern, anchor, content, pos=0):
+    """与pattern.finditer(content, pos)结果相同，但只在anchor匹配的位置上尝试匹配，anchor为compile_anchors的结果"""
+    search = anchor.search
+    match = pattern.match
+    found = search(content, pos)
+    while found:
+        start = found.start()
+        result = match(content, start)
+        if result:
+            yield result
+            # 匹配结果不重叠，下一个候选起点不早于本次匹配的结尾
+            found = search(content, max(result.end(), start + 1))
+        else:
+            found = search(content, start + 1)
@@ -1,72 +1,102 @@
-from urllib.parse import urlparse
+from itertools import islice
+import config
+from .cache import LRUSet
+from .urlnorm import normalize_url, parse_url
 from .utils import color_print, success_print, find_last_occurrences
 
 class ResultProcessor:
     """结果处理器，负责处理和分类提取的API"""
     
-    def __init__(self):
-        """初始化结果处理器"""
+    def __init__(self, sink=None, keep_results=True):
+        """初始化结果处理器
+        
+        sink为流式输出(JSONLSink)，发现API时立即写出；keep_results为False时不在内存中保存结果，只做流式输出，
+        去重只记住最近的config.DEDUP_SIZE个API
+        """
+        # 以dict作为保持插入顺序的集合，添加时即完成去重
         self.categorized_apis = {
-            "GET": [],
-            "POST": [],
-            "PUT": [],
-            "DELETE": [],
-            "PATCH": [],
-            "OPTIONS": [],
-            "HEAD": [],
-            "UNKNOWN_METHOD": []
+            "GET": {},
+            "POST": {},
+            "PUT": {},
+            "DELETE": {},
+            "PATCH": {},
+            "OPTIONS": {},
+            "HEAD": {},
+            "UNKNOWN_METHOD": {}
         }
-        self.all_urls = set()
+        self.all_urls = {}  # URL -> 域名，域名在URL加入时解析一次
         self.related_domains = set()  # 存储所有相关域名
-        self.domain_api_map = {}  # 存储域名和API的映射关系
+        self.domain_api_map = {}  # 存储域名和API的映射关系，域名 -> {API: None}
+        self._url_order = []  # 按加入顺序排列的URL，供域名归类增量处理
+        self._domain_cursor = {}  # 每个主域名已归类到_url_order中的位置
+        self.sink = sink
+        self.keep_results = keep_results
+        # 已写出的 (method, url)，避免重复记录
+        self._emitted = set() if keep_results else LRUSet(config.DEDUP_SIZE)
     
-    def process_apis(self, api_info_list, base_url):
-        """处理API信息列表，按方法分类"""
-        current_method = None
+    def process_apis(self, api_info_list, base_url, sources=None):
+        """处理API信息列表，按方法分类，sources为与api_info_list对应的来源（脚本、样式表等）
         
-        for api_info in api_info_list:
+        方法由提取器与所属的URL配对，为 ("url", URL, 方法)，没有方法的URL归入UNKNOWN_METHOD
+        """
+        for index, api_info in enumerate(api_info_list):
+            source = sources[index] if sources else base_url
             for item in api_info:
-                type_, value = item
-                if type_ == "method":
-                    current_method = value
-                elif type_ == "url" and value:
+                type_, value = item[0], item[1]
+                if type_ == "url" and value:
                     # 处理URL，转换为绝对URL
                     processed_url = self._process_api_url(base_url, value)
                     if processed_url:
-                        self.all_urls.add(processed_url)
-                        
-                        # 根据当前方法分类
-                        if current_method and current_method in self.categorized_apis:
-                            self.categorized_apis[current_method].append(processed_url)
-                            current_method = None  # 重置方法
-                        else:
-                            self.categorized_apis["UNKNOWN_METHOD"].append(processed_url)
+                        method = item[2] if len(item) > 2 else None
+                        if method not in self.categorized_apis:
+                            method = "UNKNOWN_METHOD"
+                        self._add_api(method, processed_url, source, base_url)
+        
+        if self.sink:
+            self.sink.flush()
+    
+    def _add_api(self, method, url, source, page):
+        """记录一个API端点：写出到流式输出，并按需保存在内存中"""
+        if self.sink and (method, url) not in self._emitted:
+            self._emitted.add((method, url))
+            self.sink.write(method, url, source, page, parse_url(url).netloc)
+        if self.keep_results:
+            self._add_url(url)
+            self.categorized_apis[method][url] = None
+    
+    def _add_url(self, url):
+        """记录URL及其域名"""
+        if url not in self.all_urls:
+            self.all_urls[url] = parse_url(url).netloc
+            self._url_order.append(url)
     
     def _process_api_url(self, base_url, url):
         """处理API URL，确保是绝对URL"""
         if not url or not base_url:
             return None
             
-        parsed_url = urlparse(url)
-        parsed_base = urlparse(base_url)
+        try:
+            parsed_url = parse_url(url)
+            parsed_base = parse_url(base_url)
+        except ValueError:
+            return None
         
         # 已经是完整URL
         if parsed_url.scheme and parsed_url.netloc:
-            return url
+            return normalize_url(url)
             
         # 相对路径，需要拼接
         if url.startswith("/"):
-            return f"{parsed_base.scheme}://{parsed_base.netloc}{url}"
+            return normalize_url(f"{parsed_base.scheme}://{parsed_base.netloc}{url}")
         else:
-            return f"{parsed_base.scheme}://{parsed_base.netloc}/{url.lstrip('/')}"
+            return normalize_url(f"{parsed_base.scheme}://{parsed_base.netloc}/{url.lstrip('/')}")
     
     def extract_related_domains(self, main_url):
         """提取所有相关域名（同一根域名下的所有域名）"""
         if not main_url or not self.all_urls:
             return
             
-        parsed_main = urlparse(main_url)
-        main_domain = parsed_main.netloc
+        main_domain = parse_url(main_url).netloc
         
         # 提取主域名的主要部分（去除www.等前缀）
         positions = find_last_occurrences(main_domain, ".")
@@ -77,36 +107,57 @@ class ResultProcessor:
         # 添加主域名到相关域名集合
         self.related_domains.add(main_domain)
         
-        # 分析每个URL的域名
-        for url in self.all_urls:
-            parsed_url = urlparse(url)
-            domain = parsed_url.netloc
+        # 只分析上次归类之后新加入的URL，按下标访问，不逐个跳过已归类的部分
+        url_order = self._url_order
+        for i in range(self._domain_cursor.get(main_part, 0), len(url_order)):
+            url = url_order[i]
+            domain = self.all_urls[url]
             if domain and main_part in domain:
                 self.related_domains.add(domain)
                 
                 # 建立域名和API的映射关系
-                if domain not in self.domain_api_map:
-                    self.domain_api_map[domain] = []
-                if url not in self.domain_api_map[domain]:
-                    self.domain_api_map[domain].append(url)
+                self.domain_api_map.setdefault(domain, {})[url] = None
+        self._domain_cursor[main_part] = len(url_order)
+    
+    def get_state(self):
+        """导出结果的快照，用于保存检查点"""
+        return {
+            "categorized_apis": {method: list(apis) for method, apis in self.categorized_apis.items()},
+            "all_urls": list(self.all_urls),
+            "related_domains": list(self.related_domains),
+            "domain_api_map": {domain: list(apis) for domain, apis in self.domain_api_map.items()},
+        }
+    
+    def set_state(self, state):
+        """从检查点恢复结果"""
+        for method, apis in state["categorized_apis"].items():
+            self.categorized_apis[method] = dict.fromkeys(apis)
+        for url in state["all_urls"]:
+            self._add_url(url)
+        self.related_domains = set(state["related_domains"])
+        self.domain_api_map = {domain: dict.fromkeys(apis) for domain, apis in state["domain_api_map"].items()}
+    
+    def merge(self, other):
+        """合并另一个处理器的结果，用于批量模式汇总各目标"""
+        for method, apis in other.categorized_apis.items():
+            self.categorized_apis[method].update(apis)
+        for url in other.all_urls:
+            self._add_url(url)
+        self.related_domains.update(other.related_domains)
+        for domain, apis in other.domain_api_map.items():
+            self.domain_api_map.setdefault(domain, {}).update(apis)
     
     def remove_duplicates(self):
         """去除重复的API和URL"""
-        # 去重API
-        for method in self.categorized_apis:
-            unique_apis = []
-            seen = set()
-            for api in self.categorized_apis[method]:
-                if api not in seen:
-                    seen.add(api)
-                    unique_apis.append(api)
-            self.categorized_apis[method] = unique_apis
-        
-        # 去重URL
-        self.all_urls = list(self.all_urls)
+        # 各结果集合在添加时已经去重，保留此方法以兼容原有调用
+        return
     
     def display_results(self):
         """展示处理后的结果"""
+        if not self.keep_results:
+            success_print(f"\n结果已流式写入 {self.sink.path}，共 {self.sink.records} 条记录")
+            return
+        
         # 统计总API数量
         total_apis = sum(len(apis) for apis in self.categorized_apis.values())
         
@@ -128,7 +179,7 @@ class ResultProcessor:
                 print(f"\n{method} ({len(apis)}):")
                 print("-" * len(f"{method} ({len(apis)}):"))
                 # 只显示前5个，其余计数
-                for i, api in enumerate(apis[:5]):
+                for api in islice(apis, 5):
                     print(f"  {api}")
                 if len(apis) > 5:
                     print(f"  ... 还有 {len(apis) - 5} 个未显示")
@@ -143,7 +194,7 @@ class ResultProcessor:
                 print("-" * len(f"域名: {domain}"))
                 if domain in self.domain_api_map and self.domain_api_map[domain]:
                     # 只显示前5个API，其余计数
-                    for i, api in enumerate(self.domain_api_map[domain][:5]):
+                    for api in islice(self.domain_api_map[domain], 5):
                         print(f"  {api}")
                     if len(self.domain_api_map[domain]) > 5:
                         print(f"  ... 还有 {len(self.domain_api_map[domain]) - 5} 个API未显示")
@@ -173,6 +224,6 @@ class ResultProcessor:
         # 保存子域名
         if output_subdomain:
             with open(output_subdomain, "w", encoding="utf-8") as f:
-                for subdomain in self.subdomains:
+                for subdomain in self.related_domains:
                     f.write(f"{subdomain}\n")
             success_print(f"已将子域名保存到 {output_subdomain}")
@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# 汇总表中的阶段顺序
+PHASES = [
+    "fetch.connect",   # 建立连接，包括DNS解析和TLS握手
+    "fetch.ttfb",      # 发出请求到收到响应头
+    "fetch.body",      # 读取响应体
+    "parse",           # HTML解析
+    "parse.pool",      # 等待子进程完成HTML解析
+    "regex",           # 正则提取
+    "dictionary",      # 字典匹配
+    "extract.pool",    # 等待子进程完成扫描
+    "process",         # 结果处理
+]
+
+class _NullSpan:
+    """不做任何事的上下文管理器"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class NullProfiler:
+    """未开启性能分析时使用，所有方法都是空操作，热路径上只多一次方法调用"""
+
+    enabled = False
+
+    def span(self, phase, target=None):
+        return _NULL_SPAN
+
+    def target(self, name):
+        return _NULL_SPAN
+
+    def record(self, phase, start, duration, target=None):
+        pass
+
+    def timed_iter(self, iterable, phase, target=None):
+        return iterable
+
+class _Span:
+    """计时一个阶段的上下文管理器"""
+
+    __slots__ = ("profiler", "phase", "target", "start")
+
+    def __init__(self, profiler, phase, target):
+        self.profiler = profiler
+        self.phase = phase
+        self.target = target
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.phase, self.start, time.perf_counter() - self.start, self.target)
+        return False
+
+class _TargetScope:
+    """设置当前线程的分析对象（页面或脚本URL），阶段未指定对象时归到该对象"""
+
+    __slots__ = ("local", "name", "previous")
+
+    def __init__(self, local, name):
+        self.local = local
+        self.name = name
+
+    def __enter__(self):
+        self.previous = getattr(self.local, "target", None)
+        self.local.target = self.name
+        return self
+
+    def __exit__(self, *exc):
+        self.local.target = self.previous
+        return False
+
+class Profiler:
+    """按阶段和分析对象（URL、脚本）累计耗时和次数，可输出汇总表、JSON和Chrome trace"""
+
+    enabled = True
+
+    def __init__(self, keep_events=False):
+        """keep_events为True时保存每一次计时，用于输出Chrome trace"""
+        self.keep_events = keep_events
+        self.phases = defaultdict(lambda: [0, 0.0, 0.0])  # 阶段 -> [次数, 总耗时, 最大耗时]
+        self.targets = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))  # 对象 -> 阶段 -> [次数, 总耗时]
+        self.events = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def span(self, phase, target=None):
+        """计时一个阶段"""
+        return _Span(self, phase, target)
+
+    def target(self, name):
+        """在with块内把未指定对象的阶段归到name"""
+        return _TargetScope(self._local, name)
+
+    def record(self, phase, start, duration, target=None):
+        """记录一次计时，start为time.perf_counter()的值"""
+        if target is None:
+            target = getattr(self._local, "target", None)
+        with self._lock:
+            stats = self.phases[phase]
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+            if target:
+                target_stats = self.targets[target][phase]
+                target_stats[0] += 1
+                target_stats[1] += duration
+            if self.keep_events:
+                self.events.append((phase, start, duration, target, threading.get_ident()))
+
+    def timed_iter(self, iterable, phase, target=None):
+        """迭代iterable，把等待每个元素的时间累计为一次计时"""
+        iterator = iter(iterable)
+        first = None
+        spent = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                if first is None:
+                    first = start
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    spent += time.perf_counter() - start
+                    return
+                spent += time.perf_counter() - start
+                yield item
+        finally:
+            self.record(phase, first, spent, target)
+
+    def _ordered_phases(self):
+        """按固定顺序排列的阶段，未知阶段排在最后"""
+        known = [phase for phase in PHASES if phase in self.phases]
+        return known + sorted(phase for phase in self.phases if phase not in PHASES)
+
+    def summary(self, top=10):
+        """打印各阶段的汇总表，以及耗时最多的对象"""
+        total = sum(stats[1] for stats in self.phases.values()) or 1
+        print("=" * 72)
+        # 中文字符占两列，表头的宽度相应减少
+        print(f"{'阶段':<14}{'次数':>6}{'总耗时(s)':>9}{'平均(ms)':>10}{'最大(ms)':>10}{'占比':>6}")
+        print("-" * 72)
+        for phase in self._ordered_phases():
+            count, spent, longest = self.phases[phase]
+            print(f"{phase:<16}{count:>8}{spent:>12.3f}{spent * 1000 / count:>12.2f}"
+                  f"{longest * 1000:>12.2f}{spent * 100 / total:>7.1f}%")
+        print("=" * 72)
+
+        slowest = sorted(self.targets.items(), key=lambda item: -sum(s[1] for s in item[1].values()))[:top]
+        if slowest:
+            print(f"\n耗时最多的 {len(slowest)} 个对象:")
+            for name, phases in slowest:
+                spent = sum(stats[1] for stats in phases.values())
+                detail = "，".join(f"{phase} {stats[1] * 1000:.1f}ms" for phase, stats in
+                                  sorted(phases.items(), key=lambda item: -item[1][1]))
+                print(f"  {spent:8.3f}s  {name}")
+                print(f"            {detail}")
+
+    def to_dict(self):
+        """导出为可序列化为JSON的字典"""
+        return {
+            "phases": {
+                phase: {"count": count, "total": spent, "max": longest}
+                for phase, (count, spent, longest) in ((p, self.phases[p]) for p in self._ordered_phases())
+            },
+            "targets": {
+                name: {phase: {"count": count, "total": spent} for phase, (count, spent) in phases.items()}
+                for name, phases in self.targets.items()
+            },
+        }
+
+    def save_json(self, path):
+        """保存汇总数据为JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def save_trace(self, path):
+        """保存为Chrome trace事件格式，可在chrome://tracing或Perfetto中查看"""
+        pid = os.getpid()
+        events = [
+            {
+                "name": phase,
+                "cat": phase.split(".")[0],
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": {"target": target} if target else {},
+            }
+            for phase, start, duration, target, tid in self.events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+_profiler = NullProfiler()
+
+def get_profiler():
+    """当前的性能分析器，未开启时为NullProfiler"""
+    return _profiler
+
+def enable_profiler(keep_events=False):
+    """开启性能分析并返回分析器"""
+    global _profiler
+    _profiler = Profiler(keep_events)
+    return _profiler
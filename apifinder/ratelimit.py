@@ -0,0 +1,122 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import config
+
+# 触发退避的状态码
+THROTTLE_STATUS = (429, 503)
+# 收到限流状态码时速率乘以的系数
+BACKOFF_FACTOR = 0.5
+# 延迟升高时速率乘以的系数
+LATENCY_BACKOFF_FACTOR = 0.8
+# 平滑延迟超过基线的倍数，且至少高出LATENCY_SLACK秒时视为延迟升高
+LATENCY_FACTOR = 2.0
+LATENCY_SLACK = 0.1
+# 延迟的指数加权平均系数
+LATENCY_SMOOTHING = 0.2
+# 每次正常响应后恢复的速率，占配置速率的比例
+RECOVERY_STEP = 0.05
+# 最低速率为配置速率的比例
+MIN_RATE_RATIO = 1 / 16
+
+def parse_retry_after(value):
+    """解析Retry-After头，支持秒数和HTTP日期两种形式，返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class _HostBucket:
+    """单个主机的令牌桶和自适应状态"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # Retry-After或退避期间不发送请求
+        self.latency = None       # 平滑后的响应延迟
+        self.baseline = None      # 观察到的最低平滑延迟
+        self.slowed = 0.0         # 上次因延迟升高降速的时间
+
+class HostRateLimiter:
+    """按主机(netloc)的令牌桶限速器，根据429/503、Retry-After和响应延迟自适应调整速率
+
+    每个主机独立限速，慢速或限流的主机不影响其他主机的吞吐；速率采用乘性减、加性增的方式调整
+    """
+
+    def __init__(self, rps, burst=None):
+        """rps为每个主机每秒的请求数上限，burst为允许的突发请求数"""
+        self.rps = rps
+        self.burst = burst or max(1.0, rps)
+        self.min_rps = rps * MIN_RATE_RATIO
+        self.throttled = 0  # 收到的限流响应数
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        """获取主机的令牌桶（调用方需持有锁）"""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(self.rps, self.burst)
+        return bucket
+
+    def acquire(self, host):
+        """等待直到该主机可以发送下一个请求"""
+        while True:
+            with self._lock:
+                bucket = self._bucket(host)
+                now = time.monotonic()
+                if now < bucket.blocked_until:
+                    wait = bucket.blocked_until - now
+                else:
+                    bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+                    bucket.updated = now
+                    if bucket.tokens >= 1:
+                        bucket.tokens -= 1
+                        return
+                    wait = (1 - bucket.tokens) / bucket.rate
+            time.sleep(wait)
+
+    def report(self, host, status=None, latency=None, retry_after=None):
+        """请求完成后反馈状态码、延迟（秒）和Retry-After头，据此调整该主机的速率"""
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            if status in THROTTLE_STATUS:
+                self.throttled += 1
+                bucket.rate = max(self.min_rps, bucket.rate * BACKOFF_FACTOR)
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = 1 / bucket.rate
+                bucket.blocked_until = max(bucket.blocked_until, now + min(delay, config.MAX_RETRY_AFTER))
+                bucket.tokens = min(bucket.tokens, 0)
+                return
+
+            if latency is None:
+                return
+            if bucket.latency is None:
+                bucket.latency = latency
+            else:
+                bucket.latency += LATENCY_SMOOTHING * (latency - bucket.latency)
+            if bucket.baseline is None or bucket.latency < bucket.baseline:
+                bucket.baseline = bucket.latency
+
+            slow = (bucket.latency > bucket.baseline * LATENCY_FACTOR
+                    and bucket.latency - bucket.baseline > LATENCY_SLACK)
+            if slow:
+                # 每个平滑周期最多降速一次，避免连续的慢响应把速率压到最低
+                if now - bucket.slowed >= bucket.latency:
+                    bucket.rate = max(self.min_rps, bucket.rate * LATENCY_BACKOFF_FACTOR)
+                    bucket.slowed = now
+            elif bucket.rate < self.rps:
+                bucket.rate = min(self.rps, bucket.rate + self.rps * RECOVERY_STEP)
+
+    def rate(self, host):
+        """该主机当前的速率"""
+        with self._lock:
+            return self._bucket(host).rate
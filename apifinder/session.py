@@ -0,0 +1,200 @@
+import threading
+import time
+import weakref
+from functools import partial
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+import config
+from .ratelimit import THROTTLE_STATUS
+
+# 可安全重试的幂等方法
+RETRY_METHODS = frozenset(["GET", "HEAD"])
+# 重试的服务端错误状态码，429/503在未启用限速器时同样重试
+RETRY_STATUS = (500, 502, 504)
+
+# 当前线程上次取出之后建立连接所用的时间
+_connect_time = threading.local()
+
+def take_connect_time():
+    """取出并清零当前线程累计的建立连接时间（秒），包括DNS解析和TLS握手"""
+    spent = getattr(_connect_time, "value", 0.0)
+    _connect_time.value = 0.0
+    return spent
+
+class _TimedHTTPConnection(HTTPConnection):
+    """记录建立连接耗时和次数的HTTP连接"""
+
+    stats = None  # 所属连接池的ConnectionStats
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.value = getattr(_connect_time, "value", 0.0) + time.perf_counter() - start
+        if self.stats is not None:
+            self.stats.add_open()
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """记录建立连接耗时和次数的HTTPS连接"""
+
+    stats = None  # 所属连接池的ConnectionStats
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.value = getattr(_connect_time, "value", 0.0) + time.perf_counter() - start
+        if self.stats is not None:
+            self.stats.add_open()
+
+class _StatsPool:
+    """把ConnectionStats传给新建的连接，同一连接对象断开后重连同样计入新建连接数"""
+
+    def __init__(self, *args, stats=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.stats = self.stats
+        return conn
+
+class _TimedHTTPConnectionPool(_StatsPool, HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(_StatsPool, HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class ConnectionStats:
+    """连接复用统计，汇总所有会话的连接池，批量模式下各目标的会话共用一个统计对象"""
+
+    def __init__(self):
+        self.opened = 0    # 新建的连接数，包括连接断开后的重连
+        self.requests = 0  # 已关闭连接池中发出的请求数
+        self.retries = 0   # 失败后重试的次数
+        self.received = 0  # 从网络接收的响应体字节数（压缩传输时为压缩后的大小）
+        self.decoded = 0   # 解压后的响应体字节数
+        self._adapters = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def register(self, adapter):
+        """登记适配器，统计时包括其仍在使用的连接池"""
+        with self._lock:
+            self._adapters.add(adapter)
+
+    def add_pool(self, pool):
+        """连接池被关闭前累计其请求数"""
+        with self._lock:
+            self.requests += pool.num_requests
+
+    def add_open(self):
+        """记录一次新建连接"""
+        with self._lock:
+            self.opened += 1
+
+    def add_retry(self):
+        """记录一次重试"""
+        with self._lock:
+            self.retries += 1
+
+    def add_transfer(self, received, decoded):
+        """记录一个响应体的传输字节数和解压后的字节数"""
+        with self._lock:
+            self.received += received
+            self.decoded += decoded
+
+    def totals(self):
+        """返回 (新建连接数, 请求数)，包括仍在使用的连接池"""
+        with self._lock:
+            opened, requests_sent = self.opened, self.requests
+            adapters = list(self._adapters)
+        for adapter in adapters:
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    requests_sent += pool.num_requests
+        return opened, requests_sent
+
+class _CountingRetry(Retry):
+    """每次重试时计数的Retry"""
+
+    stats = None
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.stats = self.stats
+        return retry
+
+    def increment(self, *args, **kwargs):
+        # 次数用尽时super().increment抛出MaxRetryError，不计为重试
+        retry = super().increment(*args, **kwargs)
+        if self.stats is not None:
+            self.stats.add_retry()
+        return retry
+
+class _PoolAdapter(HTTPAdapter):
+    """连接池被淘汰或关闭时把统计累计到ConnectionStats、并记录建立连接耗时的适配器"""
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+        stats.register(self)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pools.dispose_func = self._dispose
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": partial(_TimedHTTPConnectionPool, stats=self.stats),
+            "https": partial(_TimedHTTPSConnectionPool, stats=self.stats),
+        }
+
+    def _dispose(self, pool):
+        self.stats.add_pool(pool)
+        pool.close()
+
+def accept_encoding():
+    """请求头Accept-Encoding的值，config.ACCEPT_ENCODING为空时使用urllib3能够解压的所有编码
+    
+    即gzip、deflate，安装了brotli（或brotlicffi）时加上br，安装了zstandard时加上zstd
+    """
+    return config.ACCEPT_ENCODING or make_headers(accept_encoding=True)["accept-encoding"]
+
+def create_session(stats, concurrency=None, retries=None, throttle_retry=True, pool_connections=None, pool_maxsize=None):
+    """创建调优过的会话：连接池大小不小于并发数，幂等请求按指数退避重试
+
+    pool_connections为缓存连接池的主机数，pool_maxsize为每个主机连接池的最大连接数，默认使用配置
+
+    throttle_retry为True时429/503也由urllib3按Retry-After重试；启用限速器时由限速器处理，传入False，
+    此时urllib3也不再按Retry-After重试（否则带Retry-After的429/503仍会绕过限速器被立即重试）
+    """
+    concurrency = concurrency or config.CONCURRENCY
+    retries = config.RETRIES if retries is None else retries
+    pool_connections = pool_connections or config.POOL_CONNECTIONS
+    pool_maxsize = pool_maxsize or config.POOL_MAXSIZE
+    status_forcelist = RETRY_STATUS + (THROTTLE_STATUS if throttle_retry else ())
+    retry = _CountingRetry(
+        total=retries,
+        backoff_factor=config.RETRY_BACKOFF,
+        status_forcelist=status_forcelist,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=throttle_retry,
+        raise_on_status=False
+    )
+    retry.stats = stats
+    adapter = _PoolAdapter(
+        stats,
+        pool_connections=pool_connections,
+        pool_maxsize=max(pool_maxsize, concurrency),
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
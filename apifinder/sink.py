@@ -0,0 +1,35 @@
+import json
+import threading
+import config
+
+class JSONLSink:
+    """流式结果输出，每发现一个API端点立即追加一行JSON记录，写入经过缓冲"""
+
+    def __init__(self, path, buffer_size=None):
+        """以追加方式打开输出文件，buffer_size为写缓冲的字节数"""
+        self.path = path
+        self.records = 0  # 已写入的记录数
+        self._lock = threading.Lock()  # 批量模式下多个目标共用同一个输出
+        self._file = open(path, "a", encoding="utf-8",
+                          buffering=buffer_size or config.JSONL_BUFFER_SIZE)
+
+    def write(self, method, url, source, page, domain):
+        """写入一条API端点记录"""
+        line = json.dumps(
+            {"method": method, "url": url, "source": source, "page": page, "domain": domain},
+            ensure_ascii=False
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self.records += 1
+
+    def flush(self):
+        """把缓冲区中的记录写入文件"""
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        """刷新并关闭输出文件"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
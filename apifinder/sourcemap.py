@@ -0,0 +1,232 @@
+import base64
+import json
+import re
+from urllib.parse import unquote
+import config
+
+# 脚本末尾引用Source Map的注释，有多个时只有最后一个有效
+MARKER = "sourceMappingURL="
+_COMMENT_PREFIX = re.compile(r"//[#@][ \t]*\Z")
+# JSON字符串的内容（不含结尾的引号），停在块末尾或转义符上时可以从停止处继续匹配
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_PRIMITIVE = re.compile(r"[^,\]}\s]*")
+# 防止JSON劫持的前缀，Source Map规范允许出现在文件开头
+XSSI_PREFIX = ")]}'"
+# 流式读取脚本时保留的末尾字符数，更长的内联（data:）Source Map在流式模式下不会被发现
+TAIL_SIZE = 4096
+
+def find_reference(content):
+    """返回脚本内容中最后一个sourceMappingURL注释引用的地址，没有时返回None"""
+    index = content.rfind(MARKER)
+    while index != -1:
+        if _COMMENT_PREFIX.search(content[max(0, index - 16):index]):
+            parts = content[index + len(MARKER):].split(None, 1)
+            if not parts:
+                return None
+            return parts[0]
+        index = content.rfind(MARKER, 0, index)
+    return None
+
+def decode_data_url(url):
+    """解码内联在data: URL中的Source Map，不是JSON时返回None"""
+    header, _, data = url.partition(",")
+    if "json" not in header.lower():
+        return None
+    try:
+        if header.lower().endswith(";base64"):
+            return base64.b64decode(data).decode("utf-8", "ignore")
+        return unquote(data)
+    except ValueError:
+        return None
+
+def is_excluded(source):
+    """源文件是否属于第三方依赖（路径中包含config.SOURCE_MAP_EXCLUDE中的任一片段）"""
+    return any(part in source for part in config.SOURCE_MAP_EXCLUDE)
+
+class ScriptTail:
+    """包装流式读取的文本块，原样产出并保留末尾TAIL_SIZE个字符，读完后用于查找sourceMappingURL注释"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.text = ""
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if len(chunk) >= TAIL_SIZE:
+                self.text = chunk[-TAIL_SIZE:]
+            else:
+                self.text = (self.text + chunk)[-TAIL_SIZE:]
+            yield chunk
+
+class SourceMapReader:
+    """流式解析Source Map，逐个产出sourcesContent中的源码
+
+    只解析顶层的sources、sourceRoot和sourcesContent，其余字段（包括很长的mappings）边读边丢弃，
+    跳过的源码同样不生成字符串；不支持带sections的索引映射。
+    sourcesContent出现在sources之前时无法按文件名排除，此时文件名为空
+    """
+
+    def __init__(self, chunks):
+        """chunks为文本块迭代器，如Crawler.iter_chunks的结果"""
+        self._chunks = iter(chunks)
+        self._text = ""
+        self._pos = 0
+        self.sources = None     # sources字段中的源文件名
+        self.source_root = ""
+        self.excluded = 0       # 按文件名排除的源文件数
+        self.missing = 0        # 没有源码的源文件数
+        self._contents = None   # sourcesContent中的元素数，没有该字段时为None
+
+    @property
+    def complete(self):
+        """是否每个源文件都有源码或被排除，即原始源码完整覆盖了生成的脚本"""
+        return (self.sources is not None and self._contents is not None
+                and self.missing == 0 and self._contents >= len(self.sources))
+
+    def _fill(self):
+        """读入下一块，当前位置之前的内容随即丢弃"""
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        self._text = self._text[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """跳过空白，返回下一个字符，结束时返回空字符串"""
+        while True:
+            self._pos = _WHITESPACE.match(self._text, self._pos).end()
+            if self._pos < len(self._text):
+                return self._text[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Source Map格式错误: 位置 {self._pos} 处应为 {char!r}")
+        self._pos += 1
+
+    def _string(self, keep=True):
+        """读取一个JSON字符串，keep为False时只跳过，已扫描的部分随即丢弃"""
+        self._expect('"')
+        quote = self._pos - 1
+        scan = self._pos
+        while True:
+            end = _STRING_BODY.match(self._text, scan).end()
+            if end < len(self._text) and self._text[end] == '"':
+                break
+            # 字符串尚未结束，读入下一块后从end继续扫描
+            self._pos = quote if keep else end
+            scan, quote = end - self._pos, 0
+            if not self._fill():
+                raise ValueError("Source Map不完整: 字符串未结束")
+        value = json.loads(self._text[quote:end + 1], strict=False) if keep else None
+        self._pos = end + 1
+        return value
+
+    def _primitive(self):
+        """读取数字、true、false或null"""
+        while True:
+            end = _PRIMITIVE.match(self._text, self._pos).end()
+            if end < len(self._text) or not self._fill():
+                break
+        token = self._text[self._pos:end]
+        self._pos = end
+        return json.loads(token)
+
+    def _skip(self):
+        """跳过一个任意的JSON值"""
+        char = self._peek()
+        if char == '"':
+            self._string(keep=False)
+        elif char in ("[", "{"):
+            self._pos += 1
+            closing = "]" if char == "[" else "}"
+            while True:
+                char = self._peek()
+                if char == closing:
+                    self._pos += 1
+                    return
+                if char in (",", ":"):
+                    self._pos += 1
+                elif not char:
+                    raise ValueError("Source Map不完整")
+                else:
+                    self._skip()
+        elif not char:
+            raise ValueError("Source Map不完整")
+        else:
+            self._primitive()
+
+    def _value(self):
+        """读取字符串或基本类型的值，数组和对象跳过并返回None"""
+        char = self._peek()
+        if char == '"':
+            return self._string()
+        if char in ("[", "{"):
+            self._skip()
+            return None
+        return self._primitive()
+
+    def _items(self):
+        """逐个定位数组元素，每次产出时当前位置为一个元素的开头，由调用方读取或跳过"""
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield
+            char = self._peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Source Map格式错误: 位置 {self._pos - 1} 处应为 ','")
+
+    def _name(self, index):
+        """第index个源文件的名称（加上sourceRoot），未知时返回None"""
+        if self.sources is None or index >= len(self.sources) or not isinstance(self.sources[index], str):
+            return None
+        return self.source_root + self.sources[index]
+
+    def iter_sources(self, skip=None):
+        """逐个产出 (源文件名, 源码)，skip(源文件名)为True的源文件不解析其源码"""
+        if self._peek() == XSSI_PREFIX[0]:
+            while "\n" not in self._text[self._pos:]:
+                if not self._fill():
+                    raise ValueError("Source Map不完整")
+            self._pos = self._text.index("\n", self._pos) + 1
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._string()
+            self._expect(":")
+            if key == "sources":
+                self.sources = [self._value() for _ in self._items()]
+            elif key == "sourceRoot":
+                root = self._value()
+                self.source_root = root if isinstance(root, str) else ""
+            elif key == "sourcesContent":
+                self._contents = 0
+                for _ in self._items():
+                    name = self._name(self._contents)
+                    self._contents += 1
+                    if skip is not None and name and skip(name):
+                        self.excluded += 1
+                        self._skip()
+                        continue
+                    content = self._value()
+                    if isinstance(content, str):
+                        yield name, content
+                    else:
+                        self.missing += 1
+            else:
+                self._skip()
+            char = self._peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Source Map格式错误: 位置 {self._pos - 1} 处应为 ','")
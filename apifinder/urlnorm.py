@@ -0,0 +1,58 @@
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit
+import config
+
+# 各scheme的默认端口，规范化时去掉
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+@lru_cache(maxsize=config.URL_CACHE_SIZE)
+def parse_url(url):
+    """解析URL，同一URL只解析一次，返回urlsplit的结果"""
+    return urlsplit(url)
+
+@lru_cache(maxsize=config.URL_CACHE_SIZE)
+def normalize_url(url):
+    """规范化绝对URL：scheme和主机名小写、去掉默认端口、解析 . 和 .. 路径段、去掉片段
+
+    没有scheme或主机的URL原样返回，无法解析的URL（如方括号不配对的IPv6主机）返回None
+    """
+    try:
+        parts = parse_url(url)
+    except ValueError:
+        return None
+    if not parts.scheme or not parts.netloc:
+        return url
+    scheme = parts.scheme.lower()
+    path = _remove_dot_segments(parts.path) or "/"
+    return urlunsplit((scheme, _normalize_netloc(scheme, parts.netloc), path, parts.query, ""))
+
+def _normalize_netloc(scheme, netloc):
+    """主机名小写并去掉默认端口，用户信息保持不变"""
+    userinfo, at, hostport = netloc.rpartition("@")
+    if hostport.startswith("["):
+        # IPv6地址
+        end = hostport.find("]") + 1
+        host, port = hostport[:end], hostport[end + 1:]
+    else:
+        host, _, port = hostport.partition(":")
+    hostport = host.lower()
+    if port and port != DEFAULT_PORTS.get(scheme):
+        hostport += ":" + port
+    return userinfo + at + hostport
+
+def _remove_dot_segments(path):
+    """按RFC 3986解析路径中的 . 和 .. 段"""
+    if "/." not in path:
+        return path
+    segments = path.split("/")
+    output = []
+    for segment in segments:
+        if segment == "..":
+            # 保留开头的空段，不越过根路径
+            if len(output) > 1:
+                output.pop()
+        elif segment != ".":
+            output.append(segment)
+    if segments[-1] in (".", ".."):
+        output.append("")
+    return "/".join(output)
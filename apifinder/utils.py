@@ -1,6 +1,8 @@
+import os
 import re
-from urllib.parse import urlparse
 import config
+from .dictionary import APIDictionary, artifact_path, get_matcher, load_artifact, save_artifact
+from .urlnorm import normalize_url, parse_url
 
 def color_print(message, color="INFO"):
     """带颜色的打印函数"""
@@ -20,7 +22,7 @@ def warning_print(message):
     color_print(message, "WARNING")
 
 def process_url(base_url, relative_url):
-    """将相对URL转换为绝对URL"""
+    """将相对URL转换为规范化的绝对URL，无法解析时返回None"""
     if not base_url or not relative_url:
         return None
         
@@ -29,28 +31,31 @@ def process_url(base_url, relative_url):
         if relative_url.startswith(item):
             return None
     
-    parsed_base = urlparse(base_url)
+    try:
+        parsed_base = parse_url(base_url)
+    except ValueError:
+        return None
     base_scheme = parsed_base.scheme
     base_netloc = parsed_base.netloc
     base_path = parsed_base.path
     
     # 处理完整URL
     if relative_url.startswith(("http://", "https://")):
-        return relative_url
+        return normalize_url(relative_url)
     
     # 处理//开头的URL
     if relative_url.startswith("//"):
-        return f"{base_scheme}:{relative_url}"
+        return normalize_url(f"{base_scheme}:{relative_url}")
     
     # 处理绝对路径
     if relative_url.startswith("/"):
-        return f"{base_scheme}://{base_netloc}{relative_url}"
+        return normalize_url(f"{base_scheme}://{base_netloc}{relative_url}")
     
-    # 处理相对路径
+    # 处理相对路径，其中的 . 和 .. 段在规范化时解析
     if base_path.endswith("/"):
-        return f"{base_scheme}://{base_netloc}{base_path}{relative_url}"
+        return normalize_url(f"{base_scheme}://{base_netloc}{base_path}{relative_url}")
     else:
-        return f"{base_scheme}://{base_netloc}{'/'.join(base_path.split('/')[:-1])}/{relative_url}"
+        return normalize_url(f"{base_scheme}://{base_netloc}{'/'.join(base_path.split('/')[:-1])}/{relative_url}")
 
 def find_last_occurrences(string, substring):
     """查找子字符串在字符串中所有出现的位置"""
@@ -65,7 +70,7 @@ def find_last_occurrences(string, substring):
     return positions
 
 def load_api_dictionary(file_path=None):
-    """加载API路径字典"""
+    """加载API路径字典，并编译为多模式匹配器；开启字典缓存时，字典文件未变化则直接读取编译结果"""
     api_patterns = []
     
     # 如果没有指定路径，使用默认路径
@@ -73,6 +78,14 @@ def load_api_dictionary(file_path=None):
         file_path = config.API_DICTIONARY
     
     try:
+        stat = os.stat(file_path)
+        cache_path = artifact_path(file_path) if config.DICTIONARY_CACHE else None
+        if cache_path:
+            dictionary = load_artifact(cache_path, stat)
+            if dictionary is not None:
+                color_print(f"成功加载API字典，共 {len(dictionary)} 个模式", "SUCCESS")
+                return dictionary
+        
         with open(file_path, 'r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
@@ -82,25 +95,27 @@ def load_api_dictionary(file_path=None):
                 api_patterns.append(line)
         
         color_print(f"成功加载API字典，共 {len(api_patterns)} 个模式", "SUCCESS")
-        return api_patterns
+        dictionary = APIDictionary(api_patterns)
+        if cache_path:
+            save_artifact(cache_path, stat, dictionary)
+        return dictionary
         
     except FileNotFoundError:
         warning_print(f"API字典文件 {file_path} 未找到，将使用默认识别模式")
-        return []
+        return APIDictionary()
     except Exception as e:
         error_print(f"加载API字典时出错: {str(e)}")
-        return []
+        return APIDictionary()
 
 def is_api_path(url, api_patterns):
     """检查URL是否匹配任何API模式"""
     if not url or not api_patterns:
         return False
         
-    parsed_url = urlparse(url)
-    path = parsed_url.path
+    try:
+        path = parse_url(url).path
+    except ValueError:
+        return False
     
-    # 检查是否匹配任何字典模式
-    for pattern in api_patterns:
-        if pattern in path or path.startswith(pattern) or path.endswith(pattern):
-            return True
-    return False
+    # 检查是否匹配任何字典模式（一次扫描匹配全部模式）
+    return get_matcher(api_patterns).match_path(path)
@@ -0,0 +1,61 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from .dictionary import APIDictionary, DictionaryMatcher
+from .extractor import APIExtractor
+from .parser import ParsedPage
+
+# 子进程内的提取器，进程启动时创建一次，字典和正则只编译一次
+_worker_extractor = None
+
+def _init_worker(patterns, matcher_state, matchers):
+    """子进程初始化，字典匹配器由主进程的编译结果恢复"""
+    global _worker_extractor
+    matcher = DictionaryMatcher.from_state(matcher_state) if matcher_state is not None else None
+    _worker_extractor = APIExtractor(APIDictionary(patterns, matcher), matchers=matchers)
+
+def _mp_context():
+    """子进程的启动方式：子进程按需启动时主进程已有抓取线程，fork可能复制其他线程持有的锁，
+    因此使用forkserver（不支持时使用spawn）"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+def _scan(kind, content):
+    """在子进程中扫描内容，只返回与去重状态无关的候选结果"""
+    return _worker_extractor.scan(kind, content)
+
+def _parse(html_content, parser):
+    """在子进程中解析HTML"""
+    return ParsedPage(html_content, parser)
+
+class ExtractionPool:
+    """多进程提取阶段，把正则扫描和HTML解析分发到子进程，充分利用多核
+    
+    子进程只做无状态的扫描，去重（found_apis）和结果合并仍在主进程中按原顺序进行，
+    因此结果与单进程完全一致
+    """
+
+    def __init__(self, workers, api_dictionary=None, matchers=None):
+        """启动进程池，matchers为启用的匹配器名称"""
+        self.workers = workers
+        matcher_state = api_dictionary.matcher.get_state() if isinstance(api_dictionary, APIDictionary) else None
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=_mp_context(),
+            initializer=_init_worker,
+            initargs=(list(api_dictionary or []), matcher_state, matchers)
+        )
+
+    def scan_many(self, kind, contents):
+        """并行扫描多个内容，按输入顺序返回候选结果列表"""
+        return list(self._executor.map(_scan, [kind] * len(contents), contents))
+
+    def submit_parse(self, html_content, parser):
+        """提交HTML解析任务，返回Future"""
+        return self._executor.submit(_parse, html_content, parser)
+
+    def close(self):
+        """关闭进程池"""
+        self._executor.shutdown(wait=True)
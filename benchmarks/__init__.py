@@ -0,0 +1,4 @@
+"""
+APIFinder 性能基准测试
+在仓库根目录下以模块方式运行，例如: python -m benchmarks.bench_parser
+"""
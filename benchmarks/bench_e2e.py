@@ -0,0 +1,163 @@
+"""
+端到端基准测试：在本地HTTP服务器上生成测试站点，完整运行单URL分析、深度爬取和文件批量分析
+统计吞吐量（目标/s、MB/s）、内存峰值（tracemalloc）和埋入端点的召回率，可保存基线并与基线对比；
+传输量为服务器实际发送的字节数，-z 时服务器以gzip压缩传输，-sm 时获取JS包的Source Map并扫描原始源码
+用法: python -m benchmarks.bench_e2e [-p 页面数] [-k JS包大小KB] [-z] [-sm] [-s 基线文件] [-c 基线文件]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from apifinder.core import APIFinderCore
+from apifinder.urlnorm import parse_url
+from benchmarks.fixtures import FixtureServer, FixtureSite
+
+SCENARIOS = ["single", "deep", "file", "file-js"]
+
+# 对比基线时各指标的方向：1表示越大越好，-1表示越小越好
+METRICS = {"seconds": -1, "targets_per_s": 1, "mb_per_s": 1, "peak_mb": -1, "recall": 1}
+
+def run_scenario(name, site, server, workdir, core_options):
+    """运行一个场景，返回 (分析的目标数, 找到的API路径集合, 期望的API路径集合)"""
+    base = server.base_url
+    pages = list(site.page_apis)
+    core = APIFinderCore(**core_options)
+    try:
+        if name == "single":
+            core.analyze_single_url(base + pages[0])
+            targets, expected = 1, site.expected(pages[:1])
+        elif name == "deep":
+            core.deep_analyze(base + pages[0], max_depth=len(pages), max_urls=len(pages))
+            targets, expected = len(pages), site.expected()
+        else:
+            is_js = name == "file-js"
+            items = list(site.bundle_apis) if is_js else pages
+            url_file = os.path.join(workdir, f"{name}.txt")
+            with open(url_file, "w", encoding="utf-8") as f:
+                f.write("\n".join(base + item for item in items))
+            core.analyze_urls_from_file(url_file, is_js=is_js)
+            targets = len(items)
+            expected = site.expected(bundles_only=True) if is_js else site.expected()
+        found = {parse_url(url).path for url in core.processor.all_urls}
+    finally:
+        core.close()
+    return targets, found, expected
+
+def measure(name, site, server, workdir, core_options, repeat):
+    """计时repeat次取最快的一次，再单独运行一次统计内存峰值（tracemalloc会拖慢执行）"""
+    quiet = io.StringIO()
+    best = None
+    for _ in range(repeat):
+        server.reset_counters()
+        with contextlib.redirect_stdout(quiet):
+            start = time.perf_counter()
+            targets, found, expected = run_scenario(name, site, server, workdir, core_options)
+            elapsed = time.perf_counter() - start
+        quiet.seek(0)
+        quiet.truncate()
+        if best is None or elapsed < best:
+            best, scanned = elapsed, server.bytes_sent
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(quiet):
+        run_scenario(name, site, server, workdir, core_options)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": best,
+        "targets": targets,
+        "targets_per_s": targets / best,
+        "mb": scanned / 1024 / 1024,
+        "mb_per_s": scanned / 1024 / 1024 / best,
+        "peak_mb": peak / 1024 / 1024,
+        "recall": len(found & expected) / len(expected) if expected else 1.0,
+    }
+
+def print_results(results):
+    """打印结果表"""
+    print(f"{'场景':<8}{'目标数':>5}{'耗时(s)':>9}{'目标/s':>9}{'传输(MB)':>10}"
+          f"{'MB/s':>8}{'内存峰值(MB)':>10}{'召回率':>6}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['targets']:>8}{r['seconds']:>9.3f}{r['targets_per_s']:>10.1f}{r['mb']:>10.2f}"
+              f"{r['mb_per_s']:>8.2f}{r['peak_mb']:>14.2f}{r['recall'] * 100:>8.1f}%")
+
+def compare(results, baseline, threshold):
+    """与基线对比并打印变化，返回变差超过threshold（百分比）的指标列表"""
+    regressions = []
+    print(f"\n与基线对比（变差超过 {threshold:.0f}% 视为退化）:")
+    for name, r in results.items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]
+        changes = []
+        for metric, direction in METRICS.items():
+            if not old.get(metric):
+                continue
+            change = (r[metric] - old[metric]) * 100 / old[metric]
+            worse = -change * direction > threshold
+            if worse:
+                regressions.append(f"{name}.{metric}")
+            changes.append(f"{metric} {change:+.1f}%{' !' if worse else ''}")
+        print(f"  {name:<8} " + "，".join(changes))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端基准测试")
+    parser.add_argument("-p", "--pages", type=int, default=100, help="页面数")
+    parser.add_argument("-f", "--fanout", type=int, default=4, help="每个页面的链接数")
+    parser.add_argument("-b", "--bundles", type=int, default=10, help="JS包数量")
+    parser.add_argument("-k", "--bundlekb", type=int, default=256, help="每个JS包的大小（KB）")
+    parser.add_argument("-d", "--delay", type=float, default=0.0, help="每个请求的模拟延迟（毫秒）")
+    parser.add_argument("-z", "--gzip", action="store_true", help="服务器以gzip压缩传输响应")
+    parser.add_argument("-sm", "--sourcemap", action="store_true", help="获取Source Map，扫描原始源码")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="每个场景计时的次数，取最快的一次")
+    parser.add_argument("-sc", "--scenarios", default=",".join(SCENARIOS), help="运行的场景，逗号分隔")
+    parser.add_argument("-w", "--workers", type=int, help="提取进程数，默认使用配置")
+    parser.add_argument("-s", "--save", help="把结果保存为基线文件(JSON)")
+    parser.add_argument("-c", "--compare", help="与基线文件对比，有指标退化时以非零状态退出")
+    parser.add_argument("-t", "--threshold", type=float, default=10.0, help="视为退化的变化幅度（百分比）")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"未知场景: {', '.join(unknown)}，可选: {', '.join(SCENARIOS)}")
+
+    # 缓存和检查点使用默认配置（关闭），每次运行都完整抓取和提取
+    core_options = {"workers": args.workers, "source_maps": args.sourcemap}
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="apifinder-bench-") as workdir:
+        site = FixtureSite(os.path.join(workdir, "site"), args.pages, args.fanout, args.bundles, args.bundlekb)
+        with FixtureServer(site.root, args.delay / 1000, args.gzip) as server:
+            for name in names:
+                results[name] = measure(name, site, server, workdir, core_options, args.repeat)
+
+    print(f"站点: {args.pages} 个页面，链接数 {args.fanout}，{args.bundles} 个 {args.bundlekb}KB 的JS包"
+          f"{'，gzip压缩传输' if args.gzip else ''}{'，扫描Source Map' if args.sourcemap else ''}")
+    print_results(results)
+
+    params = {key: getattr(args, key) for key in ("pages", "fanout", "bundles", "bundlekb", "delay", "gzip", "sourcemap", "workers")}
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存到 {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != params:
+            print(f"\n注意: 基线的站点参数不同 {baseline.get('params')}，对比结果仅供参考")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n退化的指标: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+爬取队列扩展性基准测试：在本地合成的链接图上对比旧的列表队列与CrawlFrontier
+用法: python -m benchmarks.bench_frontier [-s 规模列表] [-f 每页链接数]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+from apifinder.crawler import Crawler
+
+def build_graph(nodes, fanout, seed=1):
+    """生成合成链接图，每个页面随机链接到fanout个页面"""
+    rng = random.Random(seed)
+    return {
+        f"http://bench.local/p{i}": [f"http://bench.local/p{rng.randrange(nodes)}" for _ in range(fanout)]
+        for i in range(nodes)
+    }
+
+class GraphCrawler(Crawler):
+    """从内存链接图读取页面的爬虫，排除网络和HTML解析的影响"""
+
+    def __init__(self, graph):
+        super().__init__(concurrency=1)
+        self.graph = graph
+
+    def fetch_content(self, url):
+        return url if url in self.graph else None
+
+    def find_links(self, url, html_content=None):
+        return self.graph[url]
+
+def legacy_crawl(graph, start_url, max_depth, max_urls):
+    """旧实现：list.pop(0) 出队，每个链接重建一次队列列表做成员判断"""
+    visited = set()
+    crawl_queue = [(start_url, 1)]
+    while crawl_queue and len(visited) < max_urls:
+        url, depth = crawl_queue.pop(0)
+        if url in visited or depth > max_depth:
+            continue
+        visited.add(url)
+        for link in graph[url]:
+            if link not in visited and link not in [u for u, d in crawl_queue]:
+                crawl_queue.append((link, depth + 1))
+    return visited
+
+def frontier_crawl(graph, start_url, max_depth, max_urls):
+    """新实现：Crawler.crawl_pages 使用的CrawlFrontier"""
+    crawler = GraphCrawler(graph)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in crawler.crawl_pages(start_url, max_depth=max_depth, max_urls=max_urls):
+            pass
+    return crawler.visited_urls
+
+def main():
+    parser = argparse.ArgumentParser(description="爬取队列扩展性基准测试")
+    parser.add_argument("-s", "--sizes", default="500,1000,2000,4000", help="链接图规模列表，逗号分隔")
+    parser.add_argument("-f", "--fanout", type=int, default=20, help="每个页面的链接数")
+    parser.add_argument("-md", "--maxdepth", type=int, default=10, help="最大爬取深度")
+    args = parser.parse_args()
+
+    print(f"{'页面数':>8} {'legacy':>12} {'frontier':>12} {'加速比':>8}")
+    for nodes in [int(size) for size in args.sizes.split(",")]:
+        graph = build_graph(nodes, args.fanout)
+        start_url = "http://bench.local/p0"
+
+        start = time.perf_counter()
+        legacy_visited = legacy_crawl(graph, start_url, args.maxdepth, nodes)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        frontier_visited = frontier_crawl(graph, start_url, args.maxdepth, nodes)
+        frontier_time = time.perf_counter() - start
+
+        assert legacy_visited == frontier_visited, "两种实现访问的URL集合不一致"
+        print(f"{nodes:>8} {legacy_time * 1000:>10.1f}ms {frontier_time * 1000:>10.1f}ms {legacy_time / frontier_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+内存基准测试：用tracemalloc统计单个文件提取过程中的内存峰值
+对比旧的字典匹配路径（先生成三份替换后的副本）与直接扫描原始内容的实现
+用法: python -m benchmarks.bench_memory [-s 文件大小MB列表]
+"""
+
+import argparse
+import random
+import tracemalloc
+from apifinder.dictionary import APIDictionary
+from apifinder.extractor import APIExtractor
+
+def generate_bundle(size_mb, seed=1):
+    """生成类似压缩后JS包的内容，包含大量字符串字面量和斜杠"""
+    rng = random.Random(seed)
+    pieces = ['var a="', 'function(e){return ', '"/api/user/info"', "orders", ";x.y('/static/", "n.push(", " payment ", "/*c*/"]
+    parts = []
+    total = 0
+    while total < size_mb * 1024 * 1024:
+        piece = rng.choice(pieces)
+        parts.append(piece)
+        total += len(piece)
+    return "".join(parts)
+
+def legacy_dictionary_matches(extractor, content):
+    """旧实现：先用三次replace生成简化副本，再在副本上匹配"""
+    simplified_content = content.replace('"', ' ').replace("'", ' ').replace('/', ' / ')
+    return extractor.dictionary_matcher.find_in_content(simplified_content)
+
+def peak_of(func):
+    """返回函数执行期间tracemalloc记录的内存峰值（MB）"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="单文件提取内存基准测试")
+    parser.add_argument("-s", "--sizes", default="1,5", help="文件大小列表（MB），逗号分隔")
+    args = parser.parse_args()
+
+    extractor = APIExtractor(APIDictionary(["orders", "payment", "user info"]))
+    print(f"{'大小':>6} {'旧字典匹配':>12} {'新字典匹配':>12} {'extract_apis':>14}")
+    for size in [float(size) for size in args.sizes.split(",")]:
+        content = generate_bundle(size)
+        legacy = peak_of(lambda: legacy_dictionary_matches(extractor, content))
+        current = peak_of(lambda: extractor._check_dictionary_matches(content, []))
+        extractor.found_apis.clear()
+        full = peak_of(lambda: extractor.extract_apis(content))
+        print(f"{size:>5.1f}M {legacy:>10.2f}MB {current:>10.2f}MB {full:>12.2f}MB")
+
+if __name__ == "__main__":
+    main()
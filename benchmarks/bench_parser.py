@@ -0,0 +1,69 @@
+"""
+HTML解析基准测试：对比旧的四次解析路径与单次解析的ParsedPage，以及不同解析后端
+用法: python -m benchmarks.bench_parser [-n 节点数] [-r 重复次数]
+"""
+
+import argparse
+import time
+from bs4 import BeautifulSoup
+from apifinder.parser import ParsedPage, PARSER_BACKENDS, resolve_parser
+
+def generate_html(nodes):
+    """生成一个类似大型SPA外壳的HTML页面"""
+    parts = ["<html><head>"]
+    for i in range(nodes // 20):
+        parts.append(f'<link rel="stylesheet" href="/css/c{i}.css"><style>.s{i}{{color:red}}</style>')
+        parts.append(f'<script src="/js/chunk-{i}.js"></script><script>window.__s{i} = "/api/v1/s{i}";</script>')
+    parts.append("</head><body>")
+    for i in range(nodes):
+        parts.append(f'<div class="c{i}" data-api="/api/item/{i}"><a href="/page/{i}">item {i}</a>'
+                     f'<span data-url="/v2/detail/{i}">{i}</span></div>')
+        if i % 50 == 0:
+            parts.append(f'<form action="/api/form/{i}"><input name="q{i}"></form>')
+    parts.append("</body></html>")
+    return "".join(parts)
+
+def legacy_parse(html_content):
+    """旧实现：脚本、样式表、元素和链接各自构建一次BeautifulSoup"""
+    soup = BeautifulSoup(html_content, "html.parser")
+    scripts = [(s.get("src"), s.get_text()) for s in soup.find_all("script")]
+    soup = BeautifulSoup(html_content, "html.parser")
+    styles = [l.get("href") for l in soup.find_all("link", rel="stylesheet")]
+    styles += [s.get_text() for s in soup.find_all("style")]
+    soup = BeautifulSoup(html_content, "html.parser")
+    elements = [f.get("action") for f in soup.find_all("form")]
+    elements += [t["data-api"] for t in soup.find_all(lambda t: t.has_attr("data-api"))]
+    elements += [t["data-url"] for t in soup.find_all(lambda t: t.has_attr("data-url"))]
+    soup = BeautifulSoup(html_content, "html.parser")
+    links = [a.get("href") for a in soup.find_all("a")]
+    return scripts, styles, elements, links
+
+def measure(func, repeat):
+    """返回多次运行中的最短耗时"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML解析基准测试")
+    parser.add_argument("-n", "--nodes", type=int, default=5000, help="页面中的元素数量")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    html_content = generate_html(args.nodes)
+    print(f"页面大小: {len(html_content) / 1024:.1f} KB")
+
+    baseline = measure(lambda: legacy_parse(html_content), args.repeat)
+    print(f"{'legacy (4x html.parser)':<28} {baseline * 1000:9.1f} ms")
+
+    for backend in PARSER_BACKENDS:
+        if resolve_parser(backend) != backend:
+            continue
+        elapsed = measure(lambda: ParsedPage(html_content, backend), args.repeat)
+        print(f"{'ParsedPage (' + backend + ')':<28} {elapsed * 1000:9.1f} ms  x{baseline / elapsed:.2f}")
+
+if __name__ == "__main__":
+    main()
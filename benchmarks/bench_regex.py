@@ -0,0 +1,100 @@
+"""
+正则预过滤基准测试：对比直接用合并后的匹配器正则做finditer与先查找各匹配器的锚点再匹配的实现
+同时检查两者的匹配结果（位置和分组）完全一致
+用法: python -m benchmarks.bench_regex [-s 文件大小MB列表] [-r API片段比例] [-f 随机一致性检查的次数]
+"""
+
+import argparse
+import random
+import time
+import config
+from apifinder.matchers import get_matchers
+from apifinder.prefilter import compile_anchors, iter_matches
+
+# 压缩后JS包中常见的片段：大量字符串字面量和引号
+PIECES = [
+    'var a="', '"', "'", 'function(e){return ', 'e.exports=', '"click"', "'div'", "n.push(", "/*c*/",
+    "x.y('", "')", "return e&&t}", "for(var i=0;i<n.length;i++){", " ", "\n", "a/b", "this.props", "中文",
+]
+# 少量URL、API调用和容易误判的片段
+API_PIECES = [
+    '"/API/v1/user/info"', "fetch('/rest/orders')", '$.ajax({url: "/api/pay", type: "post"})',
+    "method: 'POST'", "method:\"/api/x\"", "axios( '/v2/list?id=1')", '"//api.example.com/api/items"',
+    "'http://test.io/v3/things?a=b'", '"/static/js/app.js"', "'//cdn.example.com/lib.js'",
+    '"https://example.com/about"', "http://", "/v", "İ", "ſ", "K", "//", "ajax(",
+    "{url:'/api/del', method:'DELETE'}", ",{method:'PUT'})", "axios.get(", "$.post(", "URL:", ".Get(",
+]
+# API片段在生成内容中所占的比例
+API_RATIO = 0.01
+
+def generate_bundle(size_mb, seed=1, api_ratio=API_RATIO):
+    """生成类似压缩后JS包的内容"""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size_mb * 1024 * 1024:
+        piece = rng.choice(API_PIECES if rng.random() < api_ratio else PIECES)
+        parts.append(piece)
+        total += len(piece)
+    return "".join(parts)
+
+def signature(matches):
+    """匹配结果的位置和各分组，用于比较"""
+    return [(match.span(), match.groups()) for match in matches]
+
+def fuzz(pattern, anchor, rounds):
+    """用随机拼接的短内容检查两种实现的结果一致，返回不一致的内容"""
+    rng = random.Random(2)
+    alphabet = PIECES + API_PIECES + list("\"'/:.$()?=&%{}aAvV09 sStT\n") + ["method", "METHOD:", "Fetch", "AXIOS", "ajax", "url", "Url:", ".post"]
+    for i in range(rounds):
+        content = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 60)))
+        pos = rng.randint(0, len(content))
+        if signature(pattern.finditer(content, pos)) != signature(iter_matches(pattern, anchor, content, pos)):
+            return content, pos
+    return None
+
+def best_of(func, repeat=3):
+    """返回多次执行中最快的一次耗时（秒）和结果"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="正则预过滤基准测试")
+    parser.add_argument("-s", "--sizes", default="1,5", help="文件大小列表（MB），逗号分隔")
+    parser.add_argument("-r", "--ratio", type=float, default=API_RATIO, help="API片段所占的比例")
+    parser.add_argument("-f", "--fuzz", type=int, default=20000, help="随机一致性检查的次数")
+    parser.add_argument("-mt", "--matchers", default=",".join(config.MATCHERS), help="启用的匹配器，逗号分隔")
+    args = parser.parse_args()
+
+    matchers = get_matchers([name.strip() for name in args.matchers.split(",") if name.strip()])
+    if matchers.unfiltered:
+        print(f"匹配器 {', '.join(matchers.unfiltered)} 没有锚点，无法使用预过滤")
+        return
+    pattern = matchers.pattern
+    # 与REGEX_PREFILTER的设置无关，总是比较两种实现
+    anchor = compile_anchors(config.API_MATCHERS[name][2] for name in matchers.names)
+    mismatch = fuzz(pattern, anchor, args.fuzz)
+    if mismatch:
+        print(f"结果不一致: pos={mismatch[1]} content={mismatch[0]!r}")
+        return
+    print(f"随机一致性检查 {args.fuzz} 次通过")
+
+    print(f"{'大小':>6} {'匹配数':>8} {'finditer':>10} {'预过滤':>10} {'加速':>6}")
+    for size in [float(size) for size in args.sizes.split(",")]:
+        content = generate_bundle(size, api_ratio=args.ratio)
+        plain, expected = best_of(lambda: signature(pattern.finditer(content)))
+        filtered, actual = best_of(lambda: signature(iter_matches(pattern, anchor, content)))
+        if actual != expected:
+            print(f"{size:>5.1f}M 结果不一致")
+            continue
+        print(f"{size:>5.1f}M {len(expected):>8} {plain * 1000:>8.1f}ms {filtered * 1000:>8.1f}ms "
+              f"{plain / filtered:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
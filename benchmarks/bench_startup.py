@@ -0,0 +1,96 @@
+"""
+启动开销基准测试：统计APIFinder.py每次启动的耗时、导入最慢的模块和字典缓存的效果，
+并对比每个目标启动一次进程与常驻模式（-si）逐行处理同样目标的总耗时
+用法: python -m benchmarks.bench_startup [-n 目标数] [-r 重复次数] [-t 显示的包数]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import config
+from benchmarks.fixtures import FixtureServer, FixtureSite
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "APIFinder.py")
+
+def run(args, repeat, stdin=None):
+    """运行命令repeat次，返回最快的一次耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=ROOT, input=stdin, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, text=True, check=False)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def import_times(module, top):
+    """用 -X importtime 统计导入module时累计耗时最多的顶层包，返回 [(包名, 毫秒)]"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=False)
+    times = {}
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        # 只统计module本身导入的包（缩进不是最外层），包含其子模块和依赖
+        if "." not in name and parts[2].startswith("   "):
+            times[name] = max(times.get(name, 0), int(parts[1]) / 1000)
+    return sorted(times.items(), key=lambda item: -item[1])[:top]
+
+def dictionary_load(repeat, cached):
+    """在新进程中加载字典的耗时（毫秒），cached为False时先删除字典缓存"""
+    code = ("import time; from apifinder.utils import load_api_dictionary; "
+            "t = time.perf_counter(); load_api_dictionary(); print((time.perf_counter() - t) * 1000)")
+    cache_path = config.API_DICTIONARY + ".cache"
+    best = None
+    for _ in range(repeat):
+        if not cached and os.path.exists(os.path.join(ROOT, cache_path)):
+            os.remove(os.path.join(ROOT, cache_path))
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=False)
+        elapsed = float(result.stdout.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="启动开销基准测试")
+    parser.add_argument("-n", "--targets", type=int, default=20, help="对比常驻模式时的目标数")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="每项计时的重复次数，取最快的一次")
+    parser.add_argument("-t", "--top", type=int, default=8, help="显示导入最慢的包数")
+    args = parser.parse_args()
+
+    python = run([sys.executable, "-c", "pass"], args.repeat)
+    help_time = run([sys.executable, SCRIPT, "-h"], args.repeat)
+    print(f"{'空解释器':<12}{python * 1000:>10.1f}ms")
+    print(f"{'APIFinder -h':<16}{help_time * 1000:>10.1f}ms")
+
+    print(f"\n导入 apifinder.core 时最慢的 {args.top} 个包（累计，包含其依赖）:")
+    for name, spent in import_times("apifinder.core", args.top):
+        print(f"  {name:<32}{spent:>8.1f}ms")
+
+    cold = dictionary_load(args.repeat, cached=False)
+    warm = dictionary_load(args.repeat, cached=True)
+    print(f"\n字典加载: 无缓存 {cold:.1f}ms，有缓存 {warm:.1f}ms")
+
+    with tempfile.TemporaryDirectory(prefix="apifinder-bench-") as workdir:
+        site = FixtureSite(os.path.join(workdir, "site"), 1, 1, args.targets, 16)
+        with FixtureServer(site.root) as server:
+            urls = [server.base_url + path for path in site.bundle_apis]
+            url_file = os.path.join(workdir, "one.txt")
+            per_process = 0.0
+            for url in urls:
+                with open(url_file, "w", encoding="utf-8") as f:
+                    f.write(url)
+                per_process += run([sys.executable, SCRIPT, "-f", url_file, "-j"], 1)
+            resident = run([sys.executable, SCRIPT, "-si", "-j"], 1, stdin="\n".join(urls) + "\n")
+
+    print(f"\n{len(urls)} 个JS目标: 每个目标启动一次进程 {per_process:.2f}s（平均 {per_process * 1000 / len(urls):.0f}ms），"
+          f"常驻模式 {resident:.2f}s（平均 {resident * 1000 / len(urls):.0f}ms）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+基准测试用的本地站点：生成带有已知API端点的静态站点，并在本地HTTP服务器上提供
+每个JS包带有Source Map，其中包含第一方源码、各包共用的源码和 node_modules 下的依赖
+供 benchmarks.bench_e2e 使用，也可单独启动: python -m benchmarks.fixtures [-p 页面数] [-o 目录]
+"""
+
+import argparse
+import gzip
+import http.server
+import json
+import os
+import random
+import socketserver
+import tempfile
+import threading
+import time
+
+# 填充内容中使用的片段，不包含任何会被识别为API的字符串
+FILLER = [
+    "function(e,t){return e&&t}", "var n=r(12);", "o.prototype.render=function(){", "}",
+    "'/static/img/logo.png'", "window.__state", "for(var i=0;i<n.length;i++){", "a.push(i*2);",
+    "\"click\"", "document.querySelector('.btn')", "/* module */", "e.exports=t;", "null;",
+]
+
+class FixtureSite:
+    """生成的站点及其中埋入的API端点"""
+
+    def __init__(self, root, pages, fanout, bundles, bundle_kb, seed=1):
+        self.root = root
+        self.pages = pages
+        self.fanout = fanout
+        self.bundles = bundles
+        self.bundle_kb = bundle_kb
+        self.page_apis = {}    # 页面路径 -> 页面内联脚本和元素中埋入的API路径
+        self.bundle_apis = {}  # 脚本路径 -> 脚本中埋入的API路径
+        self.page_bundles = {}  # 页面路径 -> 引用的脚本路径
+        self._rng = random.Random(seed)
+        # Source Map使用单独的随机数，页面和脚本的内容与不带Source Map时相同
+        self._map_rng = random.Random(seed + 1)
+        self._generate()
+
+    def _filler(self, size, rng=None):
+        """生成约size字节的类JS填充内容"""
+        rng = rng or self._rng
+        parts = []
+        total = 0
+        while total < size:
+            piece = rng.choice(FILLER)
+            parts.append(piece)
+            total += len(piece)
+        return "".join(parts)
+
+    def _generate(self):
+        """写出全部页面、脚本和样式表"""
+        os.makedirs(os.path.join(self.root, "js"), exist_ok=True)
+        # 各包共用的依赖和公共模块，在每个Source Map中重复出现
+        vendor = {
+            "webpack:///./node_modules/vendor/index.js": self._filler(self.bundle_kb * 512, self._map_rng),
+            "webpack:///./src/shared.js": self._filler(self.bundle_kb * 64, self._map_rng),
+        }
+        for j in range(self.bundles):
+            path = f"/js/bundle{j}.js"
+            apis = [f"/api/v1/bench/b{j}/e{k}" for k in range(20)]
+            chunk = self.bundle_kb * 1024 // (len(apis) + 1)
+            parts = []
+            for api in apis:
+                parts.append(self._filler(chunk))
+                parts.append(f'var u="{api}";')
+            parts.append(self._filler(chunk))
+            parts.append(f"\n//# sourceMappingURL=bundle{j}.js.map\n")
+            self._write(path, "".join(parts))
+            self._write(path + ".map", self._source_map(j, apis, vendor))
+            self.bundle_apis[path] = set(apis)
+
+        for i in range(self.pages):
+            path = f"/p{i}.html"
+            # 树状链接保证所有页面可达，另加随机链接
+            children = [c for c in range(self.fanout * i + 1, self.fanout * i + self.fanout + 1) if c < self.pages]
+            extra = [self._rng.randrange(self.pages) for _ in range(self.fanout)]
+            bundles = [f"/js/bundle{i % self.bundles}.js", f"/js/bundle{(i * 7 + 3) % self.bundles}.js"]
+            apis = {f"/api/page/p{i}", f"/rest/fetch/p{i}", f"/api/ajax/p{i}", f"/api/form/p{i}"}
+            html = [
+                "<html><head>",
+                f'<link rel="stylesheet" href="/s{i % 3}.css">',
+                "".join(f'<script src="{b}"></script>' for b in dict.fromkeys(bundles)),
+                "<script>",
+                self._filler(512),
+                f'var a="/api/page/p{i}";fetch("/rest/fetch/p{i}");',
+                f'$.ajax({{url: "/api/ajax/p{i}", type: "POST"}});',
+                "</script></head><body>",
+                f'<form action="/api/form/p{i}"><input name="q"></form>',
+                "".join(f'<a href="/p{c}.html">p{c}</a>' for c in children + extra),
+                "</body></html>",
+            ]
+            self._write(path, "".join(html))
+            self.page_apis[path] = apis
+            self.page_bundles[path] = list(dict.fromkeys(bundles))
+
+        for k in range(3):
+            self._write(f"/s{k}.css", f".c{k}{{background:url('/static/bg{k}.png')}}")
+
+    def _source_map(self, j, apis, vendor):
+        """第j个JS包的Source Map，第一方源码中的API与压缩后的包相同"""
+        first_party = "\n".join(f'export const e{k} = "{api}";' for k, api in enumerate(apis))
+        sources = {f"webpack:///./src/api{j}.js": first_party + "\n" + self._filler(1024, self._map_rng)}
+        sources.update(vendor)
+        return json.dumps({
+            "version": 3,
+            "file": f"bundle{j}.js",
+            "mappings": "AAAA,SAASA;" * (self.bundle_kb * 16),
+            "sources": list(sources),
+            "names": [],
+            "sourcesContent": list(sources.values()),
+        })
+
+    def _write(self, path, content):
+        with open(os.path.join(self.root, path.lstrip("/")), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def expected(self, pages=None, bundles_only=False):
+        """返回给定页面（默认全部页面）应当发现的API路径集合"""
+        if bundles_only:
+            return set().union(*self.bundle_apis.values())
+        pages = list(self.page_apis) if pages is None else pages
+        expected = set()
+        for page in pages:
+            expected |= self.page_apis[page]
+            for bundle in self.page_bundles[page]:
+                expected |= self.bundle_apis[bundle]
+        return expected
+
+class _Handler(http.server.SimpleHTTPRequestHandler):
+    """静态文件处理器，可选模拟网络延迟和gzip压缩传输，并统计发送的字节数"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        path = self.translate_path(self.path)
+        if self.server.gzip and "gzip" in self.headers.get("Accept-Encoding", "") and os.path.isfile(path):
+            self._send_gzip(path)
+            return
+        super().do_GET()
+
+    def _send_gzip(self, path):
+        """以gzip压缩发送文件，压缩结果按路径缓存"""
+        with self.server.lock:
+            data = self.server.compressed.get(path)
+        if data is None:
+            with open(path, "rb") as f:
+                data = gzip.compress(f.read(), compresslevel=6)
+            with self.server.lock:
+                self.server.compressed[path] = data
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        with self.server.lock:
+            self.server.bytes_sent += len(data)
+            self.server.requests += 1
+
+    def copyfile(self, source, outputfile):
+        data = source.read()
+        outputfile.write(data)
+        with self.server.lock:
+            self.server.bytes_sent += len(data)
+            self.server.requests += 1
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class FixtureServer:
+    """在后台线程中提供站点的本地HTTP服务器，端口自动分配；gzip为True时对请求压缩传输的客户端压缩响应"""
+
+    def __init__(self, root, delay=0.0, gzip=False):
+        handler = lambda *args, **kwargs: _Handler(*args, directory=root, **kwargs)
+        self._server = _Server(("127.0.0.1", 0), handler)
+        self._server.delay = delay
+        self._server.gzip = gzip
+        self._server.compressed = {}
+        self._server.lock = threading.Lock()
+        self._server.bytes_sent = 0
+        self._server.requests = 0
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def reset_counters(self):
+        """清零统计"""
+        with self._server.lock:
+            self._server.bytes_sent = 0
+            self._server.requests = 0
+
+    @property
+    def bytes_sent(self):
+        return self._server.bytes_sent
+
+    @property
+    def requests(self):
+        return self._server.requests
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="生成基准测试站点并在本地启动HTTP服务器")
+    parser.add_argument("-p", "--pages", type=int, default=100, help="页面数")
+    parser.add_argument("-f", "--fanout", type=int, default=4, help="每个页面的链接数")
+    parser.add_argument("-b", "--bundles", type=int, default=10, help="JS包数量")
+    parser.add_argument("-k", "--bundlekb", type=int, default=256, help="每个JS包的大小（KB）")
+    parser.add_argument("-d", "--delay", type=float, default=0.0, help="每个请求的模拟延迟（毫秒）")
+    parser.add_argument("-z", "--gzip", action="store_true", help="以gzip压缩传输响应")
+    parser.add_argument("-o", "--output", help="站点目录，默认使用临时目录")
+    args = parser.parse_args()
+
+    root = args.output or tempfile.mkdtemp(prefix="apifinder-bench-")
+    site = FixtureSite(root, args.pages, args.fanout, args.bundles, args.bundlekb)
+    with FixtureServer(root, args.delay / 1000, args.gzip) as server:
+        print(f"站点目录: {root}，共埋入 {len(site.expected())} 个API端点")
+        print(f"服务地址: {server.base_url}/p0.html  (Ctrl-C 退出)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
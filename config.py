@@ -1,8 +1,22 @@
 import os
-from dotenv import load_dotenv
 
-# 加载环境变量
-load_dotenv()
+def _find_dotenv():
+    """与dotenv的查找方式相同：从本文件所在目录逐级向上查找.env文件"""
+    path = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(path, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+# 加载环境变量，没有.env文件时不导入dotenv，加快启动
+_dotenv_path = _find_dotenv()
+if _dotenv_path:
+    from dotenv import load_dotenv
+    load_dotenv(_dotenv_path)
 
 # 默认配置
 DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
@@ -10,6 +24,38 @@ DEFAULT_TIMEOUT = 10
 DEFAULT_MAX_DEPTH = 2
 DEFAULT_MAX_URLS = 100
 DEFAULT_API_DICTIONARY = "api_dictionary.txt"
+DEFAULT_CONCURRENCY = 10
+DEFAULT_PER_HOST_CONCURRENCY = 4
+DEFAULT_HTML_PARSER = "html.parser"
+DEFAULT_EXTRACT_CACHE_SIZE = 512
+DEFAULT_MAX_BODY_SIZE = 20 * 1024 * 1024
+DEFAULT_ACCEPT_ENCODING = ""
+DEFAULT_HTTP_CACHE_SPOOL_SIZE = 1024 * 1024
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+DEFAULT_STREAM_OVERLAP = 4096
+DEFAULT_WORKERS = 0
+DEFAULT_BATCH_SIZE = 1
+DEFAULT_TARGET_TIMEOUT = 0
+DEFAULT_CHECKPOINT_PAGES = 50
+DEFAULT_CHECKPOINT_SECONDS = 60
+DEFAULT_JSONL_BUFFER_SIZE = 64 * 1024
+DEFAULT_DEDUP_SIZE = 100000
+DEFAULT_URL_CACHE_SIZE = 65536
+DEFAULT_RATE_LIMIT = 0
+DEFAULT_RATE_LIMIT_RETRIES = 2
+DEFAULT_MAX_RETRY_AFTER = 120
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_POOL_CONNECTIONS = 32
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_REGEX_PREFILTER = 1
+DEFAULT_MATCHERS = "path,url,object,method,call,shortcut,ajax"
+DEFAULT_DICTIONARY_CACHE = 1
+DEFAULT_DICTIONARY_CACHE_DIR = ""
+DEFAULT_SOURCE_MAPS = 0
+DEFAULT_SOURCE_MAP_EXCLUDE = "node_modules/"
+DEFAULT_SKIP_CONTENT_TYPES = "image/,video/,audio/,font/,application/octet-stream,application/pdf,application/zip"
 
 # 从环境变量获取配置，没有则使用默认值
 USER_AGENT = os.getenv("USER_AGENT", DEFAULT_USER_AGENT)
@@ -17,6 +63,50 @@ TIMEOUT = int(os.getenv("TIMEOUT", DEFAULT_TIMEOUT))
 MAX_DEPTH = int(os.getenv("MAX_DEPTH", DEFAULT_MAX_DEPTH))
 MAX_URLS = int(os.getenv("MAX_URLS", DEFAULT_MAX_URLS))
 API_DICTIONARY = os.getenv("API_DICTIONARY", DEFAULT_API_DICTIONARY)
+# 字典缓存，把编译结果按字典文件的路径保存在缓存目录中，字典文件修改后自动失效
+DICTIONARY_CACHE = int(os.getenv("DICTIONARY_CACHE", DEFAULT_DICTIONARY_CACHE))
+# 字典缓存目录，留空时使用 $XDG_CACHE_HOME/apifinder（未设置时为 ~/.cache/apifinder）
+DICTIONARY_CACHE_DIR = os.getenv("DICTIONARY_CACHE_DIR", DEFAULT_DICTIONARY_CACHE_DIR)
+CONCURRENCY = int(os.getenv("CONCURRENCY", DEFAULT_CONCURRENCY))
+PER_HOST_CONCURRENCY = int(os.getenv("PER_HOST_CONCURRENCY", DEFAULT_PER_HOST_CONCURRENCY))
+HTML_PARSER = os.getenv("HTML_PARSER", DEFAULT_HTML_PARSER)
+EXTRACT_CACHE_SIZE = int(os.getenv("EXTRACT_CACHE_SIZE", DEFAULT_EXTRACT_CACHE_SIZE))
+EXTRACT_CACHE_PATH = os.getenv("EXTRACT_CACHE_PATH", "")
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "")
+# 流式读取（-j、Source Map）时待写入HTTP缓存的响应体在内存中暂存的上限，超过后写入临时文件
+HTTP_CACHE_SPOOL_SIZE = int(os.getenv("HTTP_CACHE_SPOOL_SIZE", DEFAULT_HTTP_CACHE_SPOOL_SIZE))
+MAX_BODY_SIZE = int(os.getenv("MAX_BODY_SIZE", DEFAULT_MAX_BODY_SIZE))
+# 请求的压缩编码，留空时使用所有能够解压的编码（gzip、deflate，安装brotli后包括br）；设为identity关闭压缩
+ACCEPT_ENCODING = os.getenv("ACCEPT_ENCODING", DEFAULT_ACCEPT_ENCODING)
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", DEFAULT_STREAM_CHUNK_SIZE))
+STREAM_OVERLAP = int(os.getenv("STREAM_OVERLAP", DEFAULT_STREAM_OVERLAP))
+WORKERS = int(os.getenv("WORKERS", DEFAULT_WORKERS))
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", DEFAULT_BATCH_SIZE))
+TARGET_TIMEOUT = float(os.getenv("TARGET_TIMEOUT", DEFAULT_TARGET_TIMEOUT))
+CHECKPOINT_PAGES = int(os.getenv("CHECKPOINT_PAGES", DEFAULT_CHECKPOINT_PAGES))
+CHECKPOINT_SECONDS = float(os.getenv("CHECKPOINT_SECONDS", DEFAULT_CHECKPOINT_SECONDS))
+JSONL_BUFFER_SIZE = int(os.getenv("JSONL_BUFFER_SIZE", DEFAULT_JSONL_BUFFER_SIZE))
+# 不汇总结果（-ns）时去重所记住的最近URL数，内存占用不随结果数增长；超出后较早的URL再次出现时会重复写出
+DEDUP_SIZE = int(os.getenv("DEDUP_SIZE", DEFAULT_DEDUP_SIZE))
+URL_CACHE_SIZE = int(os.getenv("URL_CACHE_SIZE", DEFAULT_URL_CACHE_SIZE))
+RATE_LIMIT = float(os.getenv("RATE_LIMIT", DEFAULT_RATE_LIMIT))
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", DEFAULT_RATE_LIMIT_RETRIES))
+MAX_RETRY_AFTER = float(os.getenv("MAX_RETRY_AFTER", DEFAULT_MAX_RETRY_AFTER))
+CONNECT_TIMEOUT = float(os.getenv("CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT))
+READ_TIMEOUT = float(os.getenv("READ_TIMEOUT", TIMEOUT))
+RETRIES = int(os.getenv("RETRIES", DEFAULT_RETRIES))
+RETRY_BACKOFF = float(os.getenv("RETRY_BACKOFF", DEFAULT_RETRY_BACKOFF))
+POOL_CONNECTIONS = int(os.getenv("POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS))
+POOL_MAXSIZE = int(os.getenv("POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE))
+# 正则预过滤，只在API_MATCHERS中各匹配器的锚点出现的位置上运行完整正则
+REGEX_PREFILTER = int(os.getenv("REGEX_PREFILTER", DEFAULT_REGEX_PREFILTER))
+# 启用的API匹配器，名称见API_MATCHERS
+MATCHERS = [m.strip() for m in os.getenv("MATCHERS", DEFAULT_MATCHERS).split(",") if m.strip()]
+# 按脚本末尾的sourceMappingURL获取Source Map，扫描其中的原始源码
+SOURCE_MAPS = int(os.getenv("SOURCE_MAPS", DEFAULT_SOURCE_MAPS))
+# 路径中包含这些片段的原始源码视为第三方依赖，不扫描
+SOURCE_MAP_EXCLUDE = [p.strip() for p in os.getenv("SOURCE_MAP_EXCLUDE", DEFAULT_SOURCE_MAP_EXCLUDE).split(",") if p.strip()]
+SKIP_CONTENT_TYPES = [t.strip().lower() for t in os.getenv("SKIP_CONTENT_TYPES", DEFAULT_SKIP_CONTENT_TYPES).split(",") if t.strip()]
 
 # 颜色配置
 COLORS = {
@@ -27,26 +117,50 @@ COLORS = {
     "RESET": "\033[0m"     # 重置
 }
 
-# API 正则表达式模式
-API_REGEX_PATTERNS = r"""
-    # 匹配 API 路径和方法
-    (?:["']|(?:method:\s*["']))
-    (
-        # 常见 API 路径模式
-        (?:/api/|/v\d+/|/rest/|/service/|/interface/|/action/|/graphql|/rpc/)[\w\-/]+
-        (?:\?[\w=&%\-]*|)
-        |
-        # 完整 URL 形式的 API
-        (?:[a-zA-Z]{1,10}://|//)[^"'/]{1,}\.[a-zA-Z]{2,}[^"']{0,}/(?:api/|v\d+/|rest/)[\w\-/?=&%]+
-    )
-    (?:["']|(?=["']))
-    |
-    # 匹配 HTTP 方法
-    (?:method:\s*["'])(GET|POST|PUT|DELETE|PATCH|OPTIONS|HEAD)(?:["'])
-    |
-    # 匹配 fetch/axios 调用
-    (?:fetch|axios)\s*\(\s*["']([^"']+?)["']
-    |
-    # 匹配 jQuery AJAX 调用
-    \$.ajax\(\s*\{[^}]*(?:url|url)\s*:\s*["']([^"']+?)["']
-"""
+# API 匹配器：名称 -> (结果类型, 正则表达式, 锚点)
+# 正则以 re.VERBOSE | re.IGNORECASE 编译，第一个分组为提取的值；结果类型为 candidate（待校验的API）或 method（HTTP方法）
+# candidate 其后的分组（可选）为同一调用或对象字面量中的HTTP方法；method 要求同一对象中后面还有引号，只与紧随其后的URL配对
+# 锚点是正则匹配开头必然出现的内容（以 re.IGNORECASE 编译），预过滤只在锚点匹配的位置上尝试完整正则；
+# 修改正则时需保证锚点仍能在每个匹配的起点匹配，为None时不使用预过滤
+# 各匹配器合并为一个正则，同一位置按这里的顺序优先，匹配结果不重叠
+API_MATCHERS = {
+    # 引号中的常见 API 路径，可带 method: 前缀
+    "path": ("candidate", r"""
+        (?:["']|(?:method:\s*["']))
+        ((?:/api/|/v\d+/|/rest/|/service/|/interface/|/action/|/graphql|/rpc/)[\w\-/]+(?:\?[\w=&%\-]*|))
+        (?:["']|(?=["']))
+    """, r"""["'](?:/api/|/v\d|/rest/|/service/|/interface/|/action/|/graphql|/rpc/)|method:"""),
+    # 引号中完整 URL 形式的 API
+    "url": ("candidate", r"""
+        (?:["']|(?:method:\s*["']))
+        ((?:[a-zA-Z]{1,10}://|//)[^"'/]{1,}\.[a-zA-Z]{2,}[^"']{0,}/(?:api/|v\d+/|rest/)[\w\-/?=&%]+)
+        (?:["']|(?=["']))
+    """, r"""["'](?:[a-z]{1,10}:)?//|method:"""),
+    # 对象字面量中先写URL后写方法，如 {url: "/api/x", method: "POST"}
+    "object": ("candidate", r"""
+        \burl\s*:\s*["']([^"']+?)["']
+        [^{}();]{0,100}?\bmethod\s*:\s*["'](GET|POST|PUT|DELETE|PATCH|OPTIONS|HEAD)["']
+    """, r"url"),
+    # HTTP 方法，如 {method: "POST", url: "/api/x"}
+    "method": ("method", r"""
+        (?:method:\s*["'])(GET|POST|PUT|DELETE|PATCH|OPTIONS|HEAD)(?:["'])
+        (?=[^{}();]{0,100}?["'])
+    """, r"method:"),
+    # fetch/axios 调用，可带 {method: ...} 选项
+    "call": ("candidate", r"""
+        (?:fetch|axios)\s*\(\s*["']([^"']+?)["']
+        (?:\s*,\s*\{(?:[^{}]|\{[^{}]*\})*?\bmethod\s*:\s*["'](GET|POST|PUT|DELETE|PATCH|OPTIONS|HEAD)["'])?
+    """, r"fetch|axios"),
+    # axios.post(...)、$.get(...) 等简写，URL分组写在前瞻中，保证其为第1个分组
+    "shortcut": ("candidate", r"""
+        (?:axios|\$)\.(?=\w+\s*\(\s*["']([^"']+?)["'])
+        (get|post|put|delete|patch|options|head)\s*\(\s*["'][^"']+?["']
+    """, r"(?:axios|\$)\."),
+    # jQuery AJAX 调用，type/method 可写在 url 之前或之后
+    "ajax": ("candidate", r"""
+        \$\.ajax\(\s*\{
+        (?=[^}]*?\burl\s*:\s*["']([^"']+?)["'])
+        (?=(?:[^}]*?\b(?:type|method)\s*:\s*["'](GET|POST|PUT|DELETE|PATCH|OPTIONS|HEAD)["'])?)
+        [^}]*
+    """, r"\$\.ajax\("),
+}
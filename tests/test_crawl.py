@@ -0,0 +1,83 @@
+"""爬取流程的测试"""
+import functools
+import socket
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from apifinder.core import APIFinderCore
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def site(tmp_path):
+    """包含无法解析的链接和脚本地址的站点"""
+    (tmp_path / "index.html").write_text(
+        '<a href="http://[bad/">bad</a><a href="//[::1/x">bad</a><a href="/next.html">next</a>'
+        '<script src="//[::1/app.js"></script><script>fetch("/api/index")</script>'
+    )
+    (tmp_path / "next.html").write_text('<script>fetch("/api/next")</script>')
+    (tmp_path / "bundle.html").write_text('<script src="/app.js"></script>')
+    (tmp_path / "app.js").write_text("x();" * 5000 + 'fetch("/api/bundle");' + "y();" * 5000)
+    handler = functools.partial(_QuietHandler, directory=str(tmp_path))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def _found(finder):
+    return set(finder.processor.categorized_apis["UNKNOWN_METHOD"])
+
+def test_external_scripts_are_scanned_while_streaming(site, monkeypatch):
+    finder = APIFinderCore(api_dictionary_path="", http_cache_path="")
+    fetched = []
+    fetch_body = finder.crawler.fetch_body
+    monkeypatch.setattr(finder.crawler, "fetch_body", lambda url: fetched.append(url) or fetch_body(url))
+    try:
+        finder.analyze_single_url(f"{site}/bundle.html")
+        assert _found(finder) == {f"{site}/api/bundle"}
+        # 外部脚本不整体下载
+        assert fetched == [f"{site}/bundle.html"]
+    finally:
+        finder.close()
+
+def test_malformed_urls_do_not_stop_deep_crawl(site):
+    finder = APIFinderCore(api_dictionary_path="", http_cache_path="")
+    try:
+        finder.deep_analyze(f"{site}/index.html", max_depth=2, max_urls=10)
+        assert _found(finder) == {f"{site}/api/index", f"{site}/api/next"}
+    finally:
+        finder.close()
+
+def test_malformed_script_src_does_not_stop_single_url(site):
+    finder = APIFinderCore(api_dictionary_path="", http_cache_path="")
+    try:
+        finder.analyze_single_url(f"{site}/index.html")
+        assert _found(finder) == {f"{site}/api/index"}
+    finally:
+        finder.close()
+
+@pytest.fixture
+def silent_host():
+    """接受连接但从不返回响应头的主机"""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    yield f"http://127.0.0.1:{server.getsockname()[1]}"
+    server.close()
+
+def test_target_timeout_covers_waiting_for_headers(silent_host, tmp_path):
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text(f"{silent_host}/a\n{silent_host}/b\n")
+    finder = APIFinderCore(api_dictionary_path="", http_cache_path="", target_timeout=1,
+                           read_timeout=30, retries=3)
+    try:
+        start = time.monotonic()
+        finder.analyze_urls_from_file(str(url_file))
+        # 默认-b 1时也按时间上限放弃，不等待read_timeout×(retries+1)
+        assert time.monotonic() - start < 5
+    finally:
+        finder.close()
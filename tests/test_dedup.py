@@ -0,0 +1,29 @@
+"""不汇总结果（--nosummary）时的去重测试"""
+import json
+import config
+from apifinder.cache import LRUSet
+from apifinder.processor import ResultProcessor
+from apifinder.sink import JSONLSink
+
+BASE_URL = "http://example.com/"
+
+def test_lru_set_evicts_least_recent():
+    seen = LRUSet(2)
+    seen.add("a")
+    seen.add("b")
+    assert "a" in seen  # 命中后成为最近使用的键
+    seen.add("c")
+    assert list(seen) == ["a", "c"]
+
+def test_nosummary_dedup_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DEDUP_SIZE", 10)
+    sink = JSONLSink(str(tmp_path / "apis.jsonl"))
+    processor = ResultProcessor(sink=sink, keep_results=False)
+    api_info = [("url", f"/api/item{i}") for i in range(100)]
+    processor.process_apis([api_info, api_info[-5:]], BASE_URL)
+    sink.close()
+    assert len(processor._emitted) == 10
+    assert not processor.all_urls
+    with open(sink.path, encoding="utf-8") as f:
+        urls = [json.loads(line)["url"] for line in f]
+    assert len(urls) == 100 and len(set(urls)) == 100
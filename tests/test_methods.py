@@ -0,0 +1,38 @@
+"""HTTP方法与URL配对的测试"""
+from apifinder.extractor import APIExtractor
+from apifinder.processor import ResultProcessor
+
+BASE_URL = "http://example.com/"
+
+def _categorize(*scripts):
+    """提取每段脚本并分类，返回 URL -> 方法"""
+    extractor = APIExtractor()
+    processor = ResultProcessor()
+    processor.process_apis([extractor.extract_apis(script, BASE_URL) for script in scripts], BASE_URL)
+    return {url: method for method, urls in processor.categorized_apis.items() for url in urls}
+
+def test_method_after_url():
+    apis = _categorize('fetch("/api/create",{method:"POST"});fetch("/api/list")')
+    assert apis == {"http://example.com/api/create": "POST", "http://example.com/api/list": "UNKNOWN_METHOD"}
+
+def test_method_before_url():
+    apis = _categorize('request({method:"PUT", url:"/api/update"});get("/api/list")')
+    assert apis == {"http://example.com/api/update": "PUT", "http://example.com/api/list": "UNKNOWN_METHOD"}
+
+def test_url_in_object():
+    apis = _categorize('request({url:"/api/remove", method:"DELETE"});get("/api/list")')
+    assert apis == {"http://example.com/api/remove": "DELETE", "http://example.com/api/list": "UNKNOWN_METHOD"}
+
+def test_shortcut_and_ajax():
+    apis = _categorize('axios.patch("/api/patch");$.ajax({url:"/api/save",type:"POST"})')
+    assert apis == {"http://example.com/api/patch": "PATCH", "http://example.com/api/save": "POST"}
+
+def test_method_does_not_leak_across_scripts():
+    apis = _categorize('var options = {method:"POST"}', 'fetch("/api/list")')
+    assert apis == {"http://example.com/api/list": "UNKNOWN_METHOD"}
+
+def test_streaming_matches_whole():
+    script = ";".join(f'request({{method:"PUT", url:"/api/item{i}"}});fetch("/api/list{i}")' for i in range(500))
+    whole = APIExtractor().extract_apis(script, BASE_URL)
+    chunks = [script[i:i + 997] for i in range(0, len(script), 997)]
+    assert list(APIExtractor().iter_apis(iter(chunks), BASE_URL)) == whole
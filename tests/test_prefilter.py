@@ -0,0 +1,30 @@
+"""正则预过滤的测试"""
+import config
+from apifinder import matchers
+from apifinder.extractor import APIExtractor
+from apifinder.prefilter import iter_matches
+
+def _signature(found):
+    return [(match.span(), match.groups()) for match in found]
+
+def test_builtin_matchers_use_prefilter():
+    assert matchers.get_matchers().prefilter
+
+def test_prefilter_matches_finditer():
+    matcher_set = matchers.get_matchers()
+    content = ('x="/API/v1/a"; fetch(\'/rest/b\'); \'ſ://h.io/api/c\' "K://h.io/v2/d" İ "//h.io/api/e" '
+               '{URL: "/api/f", method: "PUT"} method: "POST", "/api/g" axios.get("/v3/h") $.ajax({url: "/api/i"})')
+    for pos in range(len(content)):
+        assert _signature(iter_matches(matcher_set.pattern, matcher_set.anchor, content, pos)) == \
+            _signature(matcher_set.pattern.finditer(content, pos))
+
+def test_matcher_without_anchor_disables_prefilter(monkeypatch):
+    kind, pattern, _ = config.API_MATCHERS["path"]
+    monkeypatch.setitem(config.API_MATCHERS, "path", (kind, pattern.replace("/api/|", "/api/|/openapi/|"), None))
+    matchers._compile.cache_clear()
+    try:
+        assert not matchers.get_matchers().prefilter
+        apis = APIExtractor().extract_apis('var a = "/openapi/v1/users";', "http://example.com/")
+        assert ("url", "/openapi/v1/users") in apis
+    finally:
+        matchers._compile.cache_clear()
@@ -0,0 +1,114 @@
+"""连接复用统计和重试的测试"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import config
+from apifinder.crawler import Crawler
+from apifinder.ratelimit import HostRateLimiter
+from apifinder.session import ConnectionStats, create_session
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    keep_alive = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        if not self.keep_alive:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(params=[True, False], ids=["keep-alive", "close"])
+def server(request):
+    handler = type("Handler", (_Handler,), {"keep_alive": request.param})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}/", request.param
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_opened_counts_reconnects(server):
+    url, keep_alive = server
+    stats = ConnectionStats()
+    session = create_session(stats)
+    for _ in range(4):
+        session.get(url)
+    session.close()
+    assert stats.totals() == ((1 if keep_alive else 4), 4)
+
+class _ThrottleHandler(BaseHTTPRequestHandler):
+    """第一次请求返回带Retry-After的429，之后返回200"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.hits += 1
+        throttled = self.server.hits == 1
+        self.send_response(429 if throttled else 200)
+        if throttled:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.mark.parametrize("throttle_retry, status", [(True, 200), (False, 429)])
+def test_throttle_status_left_to_rate_limiter(throttle_retry, status):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ThrottleHandler)
+    httpd.hits = 0
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        session = create_session(ConnectionStats(), throttle_retry=throttle_retry)
+        assert session.get(f"http://127.0.0.1:{httpd.server_port}/").status_code == status
+        session.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+class _FailingHandler(BaseHTTPRequestHandler):
+    """总是返回502"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.hits += 1
+        self.send_response(502)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class _CountingLimiter(HostRateLimiter):
+    def __init__(self, rps):
+        super().__init__(rps)
+        self.acquired = 0
+
+    def acquire(self, host):
+        self.acquired += 1
+        super().acquire(host)
+
+def test_retries_pass_through_rate_limiter(monkeypatch):
+    monkeypatch.setattr(config, "RETRY_BACKOFF", 0)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FailingHandler)
+    httpd.hits = 0
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    limiter = _CountingLimiter(100)
+    crawler = Crawler(rate_limiter=limiter, retries=2)
+    try:
+        assert crawler.fetch_content(f"http://127.0.0.1:{httpd.server_port}/") is None
+        # 每次尝试都先从限速器取得令牌
+        assert httpd.hits == limiter.acquired == 3
+    finally:
+        crawler.close()
+        httpd.shutdown()
+        httpd.server_close()
+
+def test_pool_sizes_override_config():
+    session = create_session(ConnectionStats(), concurrency=4, pool_connections=7, pool_maxsize=9)
+    adapter = session.get_adapter("http://example.com/")
+    assert (adapter._pool_connections, adapter._pool_maxsize) == (7, 9)
+    session.close()